@@ -1,27 +1,269 @@
 from dotenv import load_dotenv
-from prompts import AGENT_INSTRUCTION, SESSION_INSTRUCTION
+from prompts import AGENT_INSTRUCTION, PROMPT_MODES, get_agent_instruction, get_session_instruction
 from livekit import agents
-from livekit.agents import AgentSession, Agent, RoomInputOptions
+from livekit.agents import AgentSession, Agent, RoomInputOptions, ChatContext, ChatMessage, StopResponse
 from livekit.plugins import noise_cancellation, silero
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 from livekit.plugins import tavus
 load_dotenv(".env")
 
-from mcp_client import MCPServerSse
+from mcp_client import MCPServerSse, PooledMCPServer
+from mcp_client.tool_cache import tool_schema_cache
 from mcp_client.agent_tools import MCPToolsIntegration
-from mcp_client.navigation_tools import set_room_context, NAVIGATION_TOOLS
+from mcp_client.navigation_tools import set_room_context, send_navigation_command, NAVIGATION_TOOLS
+from tools import detect_navigation_intent
+from startup import StartupGraph
 import os
+import json
 import logging
+import asyncio
+import time
 
 logger = logging.getLogger(__name__)
+
+# How clear navigation commands are handled before the LLM runs:
+#   "canned" - navigate and speak a fixed confirmation (no LLM call)
+#   "llm"    - navigate, then let the LLM speak the confirmation only
+#   "off"    - leave navigation to the LLM's navigate_to_page tool
+NAVIGATION_FAST_PATH = os.environ.get("NAVIGATION_FAST_PATH", "canned")
+
+
+def is_bangla(text: str) -> bool:
+    return any("\u0980" <= char <= "\u09FF" for char in text)
+
+
 class Assistant(Agent):
-    def __init__(self) -> None:
+    def __init__(self, instructions: str = AGENT_INSTRUCTION) -> None:
         super().__init__(
-            instructions=AGENT_INSTRUCTION,
+            instructions=instructions,
+        )
+
+    async def on_user_turn_completed(self, turn_ctx: ChatContext, new_message: ChatMessage) -> None:
+        """Navigate straight away on clear page requests instead of waiting for an LLM tool call"""
+        if NAVIGATION_FAST_PATH not in ("canned", "llm"):
+            return
+        utterance = new_message.text_content or ""
+        route = detect_navigation_intent(utterance)
+        if not route or not await send_navigation_command(route["path"]):
+            return
+        logger.info(f"Navigation fast path: '{utterance}' -> {route['path']}")
+
+        if NAVIGATION_FAST_PATH == "llm":
+            turn_ctx.add_message(
+                role="system",
+                content=(
+                    f"The user has already been taken to the {route['name']} page "
+                    f"({route['path']}). Do not call navigate_to_page; just confirm in one short sentence."
+                ),
+            )
+            return
+
+        if is_bangla(utterance):
+            self.session.say(f"{route['name']} পেজে নিয়ে যাচ্ছি!")
+        else:
+            self.session.say(f"Taking you to {route['name']} now!")
+        raise StopResponse()
+
+
+# Must match LIVEKIT_AGENT_NAME on the token server. When set, this worker only
+# joins rooms that explicitly dispatch it, one job per learner room.
+AGENT_NAME = os.environ.get("LIVEKIT_AGENT_NAME", "")
+
+LANGUAGE_NAMES = {"en": "English", "bn": "Bangla"}
+
+# Default prompt mode ("full" or "compact"); a session can override it with
+# the "prompt_mode" dispatch option
+PROMPT_MODE = os.environ.get("PROMPT_MODE", "full")
+
+
+# Load the VAD model and MCP tool schemas once per worker process instead of
+# once per job. Set to "false" to measure cold starts.
+AGENT_PREWARM = os.environ.get("AGENT_PREWARM", "true").lower() != "false"
+MCP_SERVER_URL = os.environ.get("N8N_MCP_SERVER_URL")
+MCP_PREWARM_TIMEOUT = float(os.environ.get("MCP_PREWARM_TIMEOUT", "5"))
+# Seconds each MCP server gets to connect and list its tools before it is skipped
+MCP_SERVER_TIMEOUT = float(os.environ.get("MCP_SERVER_TIMEOUT", "5"))
+# Seconds a tool call may take before the agent gets a timeout result to speak
+# around, plus per-tool overrides as JSON, e.g. {"generate_quiz": 20}
+MCP_TOOL_TIMEOUT = float(os.environ.get("MCP_TOOL_TIMEOUT", "8"))
+
+
+def get_tool_timeouts() -> dict:
+    try:
+        timeouts = json.loads(os.environ.get("MCP_TOOL_TIMEOUTS") or "{}")
+        return {name: float(seconds) for name, seconds in timeouts.items()}
+    except (ValueError, TypeError, AttributeError):
+        logger.warning("Ignoring invalid MCP_TOOL_TIMEOUTS; expected a JSON object of seconds")
+        return {}
+
+
+MCP_TOOL_TIMEOUTS = get_tool_timeouts()
+
+# Per-step startup timeouts (seconds). If MCP is slow the session starts
+# without MCP tools; the other steps are required.
+STARTUP_CONNECT_TIMEOUT = float(os.environ.get("STARTUP_CONNECT_TIMEOUT", "10"))
+STARTUP_MCP_TIMEOUT = float(os.environ.get("STARTUP_MCP_TIMEOUT", "8"))
+STARTUP_AVATAR_TIMEOUT = float(os.environ.get("STARTUP_AVATAR_TIMEOUT", "20"))
+STARTUP_SESSION_TIMEOUT = float(os.environ.get("STARTUP_SESSION_TIMEOUT", "15"))
+
+
+MCP_SERVER_NAME = "SYNAPZ_MCP_Server"
+
+
+def create_mcp_server() -> PooledMCPServer:
+    """MCP server handle for one job; its tool calls share one health-checked connection"""
+    return PooledMCPServer(
+        params={"url": MCP_SERVER_URL},
+        name=MCP_SERVER_NAME,
+        tool_timeouts=MCP_TOOL_TIMEOUTS,
+        default_tool_timeout=MCP_TOOL_TIMEOUT,
+    )
+
+
+async def fetch_mcp_tools() -> list:
+    """Connect to the MCP server once and store its tool schemas in the shared cache"""
+    server = MCPServerSse(params={"url": MCP_SERVER_URL}, cache_tools_list=True, name=MCP_SERVER_NAME)
+    try:
+        await server.connect()
+        return await server.refresh_tools()
+    finally:
+        await server.cleanup()
+
+
+def prewarm(proc: agents.JobProcess):
+    """
+    Runs once in each worker process before it accepts jobs. Loads the VAD model
+    and fetches the MCP tool schemas so jobs can start without waiting on either.
+    """
+    if not AGENT_PREWARM:
+        return
+    started = time.perf_counter()
+    proc.userdata["vad"] = silero.VAD.load()
+
+    # Tool schemas are shared through the MCP tool cache (in memory and on
+    # disk); only fetch them here if there is no fresh copy already
+    mcp_tools = []
+    cached = tool_schema_cache.get(MCP_SERVER_URL) if MCP_SERVER_URL else None
+    if cached and not cached["stale"]:
+        mcp_tools = cached["tools"]
+    elif MCP_SERVER_URL:
+        try:
+            mcp_tools = asyncio.run(
+                asyncio.wait_for(fetch_mcp_tools(), MCP_PREWARM_TIMEOUT)
+            )
+        except Exception as e:
+            logger.warning(f"Skipping MCP tool prewarm: {e}")
+
+    logger.info(
+        f"Worker prewarmed in {(time.perf_counter() - started) * 1000:.0f} ms "
+        f"({len(mcp_tools)} MCP tools cached)"
+    )
+
+
+def log_time_to_first_audio(session: AgentSession, started: float, start_kind: str):
+    """Log how long the job took to reach the agent's first spoken audio"""
+    def on_agent_state_changed(ev):
+        if ev.new_state != "speaking":
+            return
+        session.off("agent_state_changed", on_agent_state_changed)
+        logger.info(
+            f"Time to first audio: {(time.perf_counter() - started) * 1000:.0f} ms ({start_kind} start)"
+        )
+
+    session.on("agent_state_changed", on_agent_state_changed)
+
+
+def get_prompt_mode(options: dict) -> str:
+    prompt_mode = options.get("prompt_mode") or PROMPT_MODE
+    return prompt_mode if prompt_mode in PROMPT_MODES else "full"
+
+
+def get_session_options(ctx: agents.JobContext) -> dict:
+    """Read the learner's session options (language, mode) from the dispatch metadata"""
+    try:
+        options = json.loads(ctx.job.metadata or "{}")
+    except ValueError:
+        logger.warning(f"Ignoring invalid job metadata: {ctx.job.metadata}")
+        return {}
+    return options if isinstance(options, dict) else {}
+
+
+def build_session_instructions(options: dict) -> str:
+    """Extend the session instructions with the learner's requested language and mode"""
+    session_instruction = get_session_instruction(get_prompt_mode(options))
+    preferences = []
+    language = LANGUAGE_NAMES.get(options.get("language"))
+    if language:
+        preferences.append(f"- The learner chose {language}. Greet them and teach in {language}.")
+    if options.get("mode"):
+        preferences.append(f"- The learner chose {options['mode']} mode. Skip mode selection and start it.")
+    if not preferences:
+        return session_instruction
+    return session_instruction + "\n# Learner Preferences\n" + "\n".join(preferences) + "\n"
+
+
+def register_navigation_tools(agent: Agent):
+    """Register the local navigation tools with the agent"""
+    from livekit.agents.llm import FunctionTool
+    import inspect
+    for tool_def in NAVIGATION_TOOLS:
+        # Get the schema from tool definition
+        schema = tool_def['inputSchema']
+        
+        # Create parameters from schema
+        params = []
+        annotations = {}
+        schema_props = schema.get("properties", {})
+        schema_required = set(schema.get("required", []))
+        
+        type_map = {
+            "string": str,
+            "integer": int,
+            "number": float,
+            "boolean": bool,
+            "array": list,
+            "object": dict,
+        }
+        
+        # Build parameters from schema
+        for p_name, p_details in schema_props.items():
+            json_type = p_details.get("type", "string")
+            py_type = type_map.get(json_type, str)
+            annotations[p_name] = py_type
+            
+            default = inspect.Parameter.empty if p_name in schema_required else None
+            params.append(inspect.Parameter(
+                name=p_name,
+                kind=inspect.Parameter.KEYWORD_ONLY,
+                annotation=py_type,
+                default=default
+            ))
+        
+        # Get the handler function
+        tool_func = tool_def['handler']
+        
+        # Set function metadata
+        tool_func.__signature__ = inspect.Signature(parameters=params)
+        tool_func.__name__ = tool_def['name']
+        tool_func.__doc__ = tool_def['description']
+        tool_func.__annotations__ = {'return': str, **annotations}
+        
+        # Create FunctionTool with proper schema
+        function_tool_obj = FunctionTool(
+            name=tool_def['name'],
+            description=tool_def['description'],
+            callable=tool_func,
+            parameters_json_schema=schema
         )
+        
+        # Add to agent's tools
+        if hasattr(agent, '_tools') and isinstance(agent._tools, list):
+            agent._tools.append(function_tool_obj)
+            logger.info(f"Registered navigation tool with schema: {tool_def['name']}")
 
 
 async def entrypoint(ctx: agents.JobContext):
+    job_started = time.perf_counter()
     avatar_session = None
     
     try:
@@ -36,112 +278,82 @@ async def entrypoint(ctx: agents.JobContext):
                 "Please set TAVUS_API_KEY, REPLICA_ID, and PERSONA_ID in .env file"
             )
         
+        session_options = get_session_options(ctx)
+        agent_instructions = get_agent_instruction(get_prompt_mode(session_options))
+        logger.info(f"Starting agent job for room {ctx.room.name} with options: {session_options}")
+        
+        # Models loaded by prewarm() are shared by every job in this process.
+        # The turn detector needs the job's inference executor, so it is created
+        # per job; its model weights already live in the worker's inference process.
+        start_kind = "warm" if "vad" in ctx.proc.userdata else "cold"
+        vad = ctx.proc.userdata.get("vad") or silero.VAD.load()
+
         session = AgentSession(
             stt="assemblyai/universal-streaming:en",
             llm="openai/gpt-4.1-mini",
             tts="cartesia/sonic-2:9626c31c-bec5-4cca-baa8-f8ba9e84c8bc",
-            vad=silero.VAD.load(),
+            vad=vad,
             turn_detection=MultilingualModel(),
         )
+        log_time_to_first_audio(session, job_started, start_kind)
+
+        # Set room context for navigation tools
+        set_room_context(ctx.room)
+
+        # Close the job's pooled MCP connections when the job ends
+        mcp_server = create_mcp_server()
+        ctx.add_shutdown_callback(mcp_server.cleanup)
 
-        # Integrate MCP tools
-        mcp_server = MCPServerSse(
-            params={"url":os.environ.get("N8N_MCP_SERVER_URL"),},
-            cache_tools_list=True,
-            name="SYNAPZ_MCP_Server",
-        )
-        agent = await MCPToolsIntegration.create_agent_with_tools(
-            agent_class=Assistant,
-            mcp_servers=[mcp_server],
-        )
-        
-        # Start Tavus avatar session BEFORE starting the agent session
-        # This ensures video is available from the beginning
-        logger.info("Initializing Tavus video avatar...")
         avatar_session = tavus.AvatarSession(
             replica_id=replica_id,
             persona_id=persona_id,
             api_key=tavus_api_key,
         )
-        
-        # Start session with room connection
-        await session.start(
-            room=ctx.room,
-            agent=agent,
-            room_input_options=RoomInputOptions(
-                # For telephony applications, use `BVCTelephony` instead for best results
-                noise_cancellation=noise_cancellation.BVC(), 
-            ),
-        )
-        
-        # Set room context for navigation tools
-        set_room_context(ctx.room)
-        logger.info("Room context set for navigation tools")
-        
-        # Register navigation tools with the agent
-        from livekit.agents.llm import FunctionTool
-        import inspect
-        for tool_def in NAVIGATION_TOOLS:
-            # Get the schema from tool definition
-            schema = tool_def['inputSchema']
-            
-            # Create parameters from schema
-            params = []
-            annotations = {}
-            schema_props = schema.get("properties", {})
-            schema_required = set(schema.get("required", []))
-            
-            type_map = {
-                "string": str,
-                "integer": int,
-                "number": float,
-                "boolean": bool,
-                "array": list,
-                "object": dict,
-            }
-            
-            # Build parameters from schema
-            for p_name, p_details in schema_props.items():
-                json_type = p_details.get("type", "string")
-                py_type = type_map.get(json_type, str)
-                annotations[p_name] = py_type
-                
-                default = inspect.Parameter.empty if p_name in schema_required else None
-                params.append(inspect.Parameter(
-                    name=p_name,
-                    kind=inspect.Parameter.KEYWORD_ONLY,
-                    annotation=py_type,
-                    default=default
-                ))
-            
-            # Get the handler function
-            tool_func = tool_def['handler']
-            
-            # Set function metadata
-            tool_func.__signature__ = inspect.Signature(parameters=params)
-            tool_func.__name__ = tool_def['name']
-            tool_func.__doc__ = tool_def['description']
-            tool_func.__annotations__ = {'return': str, **annotations}
-            
-            # Create FunctionTool with proper schema
-            function_tool_obj = FunctionTool(
-                name=tool_def['name'],
-                description=tool_def['description'],
-                callable=tool_func,
-                parameters_json_schema=schema
+
+        async def create_agent(results: dict) -> Agent:
+            agent = await MCPToolsIntegration.create_agent_with_tools(
+                agent_class=Assistant,
+                mcp_servers=[mcp_server],
+                agent_kwargs={"instructions": agent_instructions},
+                server_timeout=MCP_SERVER_TIMEOUT,
             )
-            
-            # Add to agent's tools
-            if hasattr(agent, '_tools') and isinstance(agent._tools, list):
-                agent._tools.append(function_tool_obj)
-                logger.info(f"Registered navigation tool with schema: {tool_def['name']}")
-        
-        # Start the avatar session (this publishes video track to the room)
-        await avatar_session.start(session, room=ctx.room)
-        logger.info("Tavus video avatar started successfully - video track available")
+            register_navigation_tools(agent)
+            return agent
+
+        def create_agent_without_mcp(results: dict) -> Agent:
+            agent = Assistant(instructions=agent_instructions)
+            register_navigation_tools(agent)
+            return agent
+
+        async def start_avatar(results: dict):
+            # Start Tavus avatar session BEFORE starting the agent session
+            # This ensures video is available from the beginning
+            await avatar_session.start(session, room=ctx.room)
+            logger.info("Tavus video avatar started successfully - video track available")
+
+        async def start_session(results: dict):
+            await session.start(
+                room=ctx.room,
+                agent=results["agent"],
+                room_input_options=RoomInputOptions(
+                    # For telephony applications, use `BVCTelephony` instead for best results
+                    noise_cancellation=noise_cancellation.BVC(), 
+                ),
+            )
+
+        # MCP connect/list_tools runs alongside the room connection and the
+        # Tavus conversation setup; only the agent session waits for both
+        startup = StartupGraph(f"Startup {ctx.room.name}")
+        startup.add_step("connect_room", lambda results: ctx.connect(), timeout=STARTUP_CONNECT_TIMEOUT)
+        startup.add_step("agent", create_agent, timeout=STARTUP_MCP_TIMEOUT, fallback=create_agent_without_mcp)
+        startup.add_step("avatar", start_avatar, depends_on=("connect_room",), timeout=STARTUP_AVATAR_TIMEOUT)
+        startup.add_step(
+            "agent_session", start_session, depends_on=("agent", "avatar"), timeout=STARTUP_SESSION_TIMEOUT
+        )
+        await startup.run()
 
         await session.generate_reply(
-            instructions= SESSION_INSTRUCTION
+            instructions=build_session_instructions(session_options)
         )
         
     except Exception as e:
@@ -163,4 +375,8 @@ async def entrypoint(ctx: agents.JobContext):
 
 
 if __name__ == "__main__":
-    agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint))
+    agents.cli.run_app(agents.WorkerOptions(
+        entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm,
+        agent_name=AGENT_NAME,
+    ))
@@ -1 +1,2 @@
-from .server import MCPServer, MCPServerSse, MCPServerStdio, MCPServerSseParams, MCPServerStdioParams
\ No newline at end of file
+from .server import MCPServer, MCPServerSse, MCPServerStdio, MCPServerSseParams, MCPServerStdioParams
+from .pool import PooledMCPServer, MCPConnectionPool
@@ -2,6 +2,7 @@ import asyncio
 import logging
 import json
 import inspect
+import time
 import typing
 from typing import Any, List, Dict, Callable, Optional, Awaitable, Sequence, Tuple, Type, Union, cast
 from uuid import uuid4
@@ -9,11 +10,14 @@ from uuid import uuid4
 # Import from the MCP module
 from .util import MCPUtil, FunctionTool
 from .server import MCPServer, MCPServerSse
-from livekit.agents import ChatContext, AgentSession, JobContext, FunctionTool as Tool
+from livekit.agents import ChatContext, AgentSession, JobContext, RunContext, FunctionTool as Tool
 from mcp import CallToolRequest
 
 logger = logging.getLogger("mcp-agent-tools")
 
+# Default seconds a single MCP server may take to connect and list its tools
+DEFAULT_SERVER_TIMEOUT = 5.0
+
 class MCPToolsIntegration:
     """
     Helper class for integrating MCP tools with LiveKit agents.
@@ -23,43 +27,40 @@ class MCPToolsIntegration:
     @staticmethod
     async def prepare_dynamic_tools(mcp_servers: List[MCPServer],
                                    convert_schemas_to_strict: bool = True,
-                                   auto_connect: bool = True) -> List[Callable]:
+                                   auto_connect: bool = True,
+                                   server_timeout: Optional[float] = DEFAULT_SERVER_TIMEOUT) -> List[Callable]:
         """
         Fetches tools from multiple MCP servers and prepares them for use with LiveKit agents.
 
+        Servers are connected and queried concurrently. A server that fails or does not
+        finish within server_timeout is skipped so it cannot hold up the session.
+
         Args:
             mcp_servers: List of MCPServer instances
             convert_schemas_to_strict: Whether to convert JSON schemas to strict format
             auto_connect: Whether to automatically connect to servers if they're not connected
+            server_timeout: Seconds allowed per server for connect and list_tools, or None for no limit
 
         Returns:
             List of decorated tool functions ready to be added to a LiveKit agent
         """
         prepared_tools = []
+        started = time.perf_counter()
+
+        results = await asyncio.gather(*(
+            MCPToolsIntegration._fetch_server_tools(
+                server, convert_schemas_to_strict, auto_connect, server_timeout
+            )
+            for server in mcp_servers
+        ))
+
+        logger.info(
+            f"Fetched tools from {len(mcp_servers)} MCP servers in "
+            f"{(time.perf_counter() - started) * 1000:.0f} ms"
+        )
 
-        # Ensure all servers are connected if auto_connect is True
-        if auto_connect:
-            for server in mcp_servers:
-                if not getattr(server, 'connected', False):
-                    try:
-                        logger.debug(f"Auto-connecting to MCP server: {server.name}")
-                        await server.connect()
-                    except Exception as e:
-                        logger.error(f"Failed to connect to MCP server {server.name}: {e}")
-
-        # Process each server
-        for server in mcp_servers:
-            logger.info(f"Fetching tools from MCP server: {server.name}")
-            try:
-                mcp_tools = await MCPUtil.get_function_tools(
-                    server, convert_schemas_to_strict=convert_schemas_to_strict
-                )
-                logger.info(f"Received {len(mcp_tools)} tools from {server.name}")
-            except Exception as e:
-                logger.error(f"Failed to fetch tools from {server.name}: {e}")
-                continue
-
-            # Process each tool from this server
+        # Process each server's tools in the order the servers were given
+        for mcp_tools in results:
             for tool_instance in mcp_tools:
                 try:
                     decorated_tool = MCPToolsIntegration._create_decorated_tool(tool_instance)
@@ -70,6 +71,44 @@ class MCPToolsIntegration:
 
         return prepared_tools
 
+    @staticmethod
+    async def _fetch_server_tools(server: MCPServer, convert_schemas_to_strict: bool,
+                                  auto_connect: bool, timeout: Optional[float]) -> List[FunctionTool]:
+        """
+        Connects to one MCP server (if needed) and fetches its tools within the deadline.
+
+        Returns:
+            The server's tools, or an empty list if the server failed or timed out
+        """
+        started = time.perf_counter()
+        needs_connect = auto_connect and not MCPToolsIntegration._is_connected(server)
+
+        async def connect_and_list():
+            if needs_connect:
+                logger.debug(f"Auto-connecting to MCP server: {server.name}")
+                await server.connect()
+            return await MCPUtil.get_function_tools(
+                server, convert_schemas_to_strict=convert_schemas_to_strict
+            )
+
+        try:
+            mcp_tools = await asyncio.wait_for(connect_and_list(), timeout)
+        except Exception as e:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            reason = f"timeout {timeout}s" if isinstance(e, asyncio.TimeoutError) else str(e)
+            logger.error(f"Skipping MCP server {server.name} after {elapsed_ms:.0f} ms: {reason}")
+            if needs_connect:
+                await server.cleanup()
+            return []
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Received {len(mcp_tools)} tools from {server.name} in {elapsed_ms:.0f} ms")
+        return mcp_tools
+
+    @staticmethod
+    def _is_connected(server: MCPServer) -> bool:
+        return bool(getattr(server, 'connected', False) or getattr(server, 'session', None))
+
     @staticmethod
     def _create_decorated_tool(tool: FunctionTool) -> Callable:
         """
@@ -110,11 +149,22 @@ class MCPToolsIntegration:
                 default=default
             ))
 
+        # LiveKit passes the RunContext to this parameter; it lets the call be
+        # cancelled when the user interrupts the turn
+        params.append(inspect.Parameter(
+            name="run_ctx",
+            kind=inspect.Parameter.KEYWORD_ONLY,
+            annotation=RunContext,
+        ))
+
         # Define the actual function that will be called by the agent
-        async def tool_impl(**kwargs):
+        async def tool_impl(run_ctx: RunContext, **kwargs):
             input_json = json.dumps(kwargs)
             logger.info(f"Invoking tool '{tool.name}' with args: {kwargs}")
-            result_str = await tool.on_invoke_tool(None, input_json)
+            result_str = await tool.on_invoke_tool(run_ctx, input_json)
+            if result_str is None:
+                logger.info(f"Tool '{tool.name}' cancelled: user interrupted the turn")
+                return None
             logger.info(f"Tool '{tool.name}' result: {result_str}")
             return result_str
 
@@ -122,7 +172,7 @@ class MCPToolsIntegration:
         tool_impl.__signature__ = inspect.Signature(parameters=params)
         tool_impl.__name__ = tool.name
         tool_impl.__doc__ = tool.description
-        tool_impl.__annotations__ = {'return': str, **annotations}
+        tool_impl.__annotations__ = {'return': str, 'run_ctx': RunContext, **annotations}
 
         # Apply the decorator and return
         return function_tool()(tool_impl)
@@ -166,7 +216,8 @@ class MCPToolsIntegration:
 
     @staticmethod
     async def create_agent_with_tools(agent_class, mcp_servers: List[MCPServer], agent_kwargs: Dict = None,
-                                    convert_schemas_to_strict: bool = True) -> Any:
+                                    convert_schemas_to_strict: bool = True,
+                                    server_timeout: Optional[float] = DEFAULT_SERVER_TIMEOUT) -> Any:
         """
         Factory method to create and initialize an agent with MCP tools already loaded.
 
@@ -175,28 +226,21 @@ class MCPToolsIntegration:
             mcp_servers: List of MCP servers to register with the agent
             agent_kwargs: Additional keyword arguments to pass to the agent constructor
             convert_schemas_to_strict: Whether to convert JSON schemas to strict format
+            server_timeout: Seconds allowed per server for connect and list_tools, or None for no limit
 
         Returns:
             An initialized agent instance with MCP tools registered
         """
-        # Connect to MCP servers
-        for server in mcp_servers:
-            if not getattr(server, 'connected', False):
-                try:
-                    logger.debug(f"Connecting to MCP server: {server.name}")
-                    await server.connect()
-                except Exception as e:
-                    logger.error(f"Failed to connect to MCP server {server.name}: {e}")
-
         # Create agent instance
         agent_kwargs = agent_kwargs or {}
         agent = agent_class(**agent_kwargs)
 
-        # Prepare tools
+        # Connect to MCP servers and prepare their tools concurrently
         tools = await MCPToolsIntegration.prepare_dynamic_tools(
             mcp_servers,
             convert_schemas_to_strict=convert_schemas_to_strict,
-            auto_connect=False  # Already connected above
+            auto_connect=True,
+            server_timeout=server_timeout,
         )
 
         # Register tools with agent
@@ -11,7 +11,13 @@ import logging
 
 # Add parent directory to path to import tools
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from tools import find_route_by_keyword, navigate_to_page, ROUTES
+from tools import (
+    find_route_by_keyword,
+    navigate_to_page,
+    get_route_by_path,
+    get_available_pages_text,
+    get_suggested_pages_text,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -72,7 +78,7 @@ async def handle_navigate_to_page(arguments: dict[str, Any]) -> str:
             page = route_info['path']
             logger.info(f"Resolved keyword to route: {page}")
         else:
-            return f"I couldn't find a page matching '{page}'. Try saying: dashboard, lessons, quiz, progress, jobs, or career."
+            return f"I couldn't find a page matching '{page}'. Try saying: {get_suggested_pages_text()}."
     
     # Validate the route
     result = navigate_to_page(page)
@@ -83,10 +89,8 @@ async def handle_navigate_to_page(arguments: dict[str, Any]) -> str:
         
         if success:
             # Find route name for better response
-            route_name = next(
-                (r['name'] for r in ROUTES.values() if r['path'] == page),
-                page
-            )
+            route_info = get_route_by_path(page)
+            route_name = route_info['name'] if route_info else page
             return f"Taking you to {route_name} now!"
         else:
             return "I tried to navigate but couldn't send the command. Please check the connection."
@@ -100,11 +104,7 @@ async def handle_get_current_routes() -> str:
     Returns:
         Formatted string with all routes
     """
-    routes_list = []
-    for route_info in ROUTES.values():
-        routes_list.append(f"- {route_info['name']} ({route_info['path']}): {route_info['description']}")
-    
-    return "Available pages:\n" + "\n".join(routes_list)
+    return get_available_pages_text()
 
 # Tool definitions for MCP
 NAVIGATION_TOOLS = [
@@ -0,0 +1,295 @@
+"""
+Per-job MCP SSE connection with health checks.
+
+LiveKit runs each job in its own process (or, with the thread executor, its
+own event loop), so a connection can't outlive or be shared across jobs. Each
+job's PooledMCPServer owns one pool holding a single initialized ClientSession;
+MCP requests carry their own ids, so the job's concurrent tool calls share it.
+The connection is pinged while idle and reopened when it dies, and closed when
+the job cleans up its server.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from mcp.types import CallToolResult, Tool as MCPTool
+
+from .resilience import CircuitBreaker, call_with_retry, find_idempotent_tools
+from .server import MCPServer, MCPServerSse, MCPServerSseParams
+from .tool_cache import tool_schema_cache
+
+logger = logging.getLogger(__name__)
+
+# Seconds between health-check pings, and the timeouts for pings and connects
+MCP_POOL_HEALTH_INTERVAL = float(os.environ.get("MCP_POOL_HEALTH_INTERVAL", "30"))
+MCP_POOL_PING_TIMEOUT = float(os.environ.get("MCP_POOL_PING_TIMEOUT", "5"))
+MCP_POOL_CONNECT_TIMEOUT = float(os.environ.get("MCP_POOL_CONNECT_TIMEOUT", "5"))
+
+
+class _PooledConnection:
+    """
+    One MCPServerSse connection owned by a dedicated task.
+
+    The SSE transport is an anyio context that must be exited by the task that
+    entered it, so the owner task connects, waits until the connection is
+    closed, and then cleans up.
+    """
+
+    def __init__(self, server: MCPServerSse):
+        self.server = server
+        self.in_flight = 0
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error: Optional[BaseException] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def alive(self) -> bool:
+        return bool(self.server.session) and self._task is not None and not self._task.done()
+
+    async def open(self, timeout: float):
+        self._task = asyncio.create_task(self._run(), name=f"mcp-pool:{self.server.name}")
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except BaseException:
+            # Timed out or cancelled: stop the owner task so it doesn't wait on _closing forever
+            await self.close()
+            raise
+        if self._error:
+            raise self._error
+
+    async def close(self):
+        self._closing.set()
+        if self._task and not self._task.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(self._task), MCP_POOL_CONNECT_TIMEOUT)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+
+    async def ping(self) -> bool:
+        return await self.server.ping(MCP_POOL_PING_TIMEOUT)
+
+    async def _run(self):
+        try:
+            await self.server.connect()
+        except Exception as e:
+            # connect() cleans up after its own errors
+            self._error = e
+            self._ready.set()
+            return
+        except BaseException:
+            await self.server.cleanup()
+            raise
+        self._ready.set()
+        try:
+            await self._closing.wait()
+        finally:
+            await self.server.cleanup()
+
+
+class MCPConnectionPool:
+    """
+    The connection to a single MCP server URL for one job.
+
+    Calls share one live connection. A dead connection is replaced on the next
+    call, and a background task pings the connection while it is idle and
+    reopens it if it stops answering.
+    """
+
+    def __init__(
+        self,
+        params: MCPServerSseParams,
+        name: str,
+        health_interval: float = MCP_POOL_HEALTH_INTERVAL,
+        idempotent_tools: Optional[Iterable[str]] = None,
+    ):
+        """
+        Args:
+            params: MCPServerSse params (url, headers, timeouts)
+            name: A readable name for the server
+            health_interval: Seconds between health checks
+            idempotent_tools: Tools safe to replay on a new connection after a failure,
+                              in addition to tools annotated as read-only or idempotent
+        """
+        self.params = params
+        self.name = name
+        self.health_interval = health_interval
+        self.idempotent_tools = set(idempotent_tools or [])
+        self.circuit_breaker = CircuitBreaker(name)
+        self._connection: Optional[_PooledConnection] = None
+        self._lock = asyncio.Lock()
+        self._health_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def open(self):
+        """Open the connection and start health checks"""
+        self._closed = False
+        await self._get_connection()
+        if not self._health_task or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def list_tools(self) -> List[MCPTool]:
+        conn = await self._get_connection()
+        return await conn.server.list_tools()
+
+    def is_idempotent(self, tool_name: str) -> bool:
+        if tool_name in self.idempotent_tools:
+            return True
+        cached = tool_schema_cache.get(self.params["url"])
+        return bool(cached) and tool_name in find_idempotent_tools(cached["tools"])
+
+    async def call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None,
+                        timeout: Optional[float] = None) -> CallToolResult:
+        """
+        Invoke a tool on the connection.
+
+        A connection that drops, or that fails a ping after a failed or timed-out
+        call, is discarded; idempotent calls are then replayed on a freshly opened
+        connection with jittered backoff. Running past the timeout raises
+        ToolDeadlineError.
+        """
+        current: List[_PooledConnection] = []
+
+        async def attempt() -> CallToolResult:
+            current.clear()
+            current.append(await self._get_connection())
+            conn = current[0]
+            conn.in_flight += 1
+            try:
+                return await conn.server.call_tool_once(tool_name, arguments)
+            finally:
+                conn.in_flight -= 1
+
+        async def drop_connection(error: Exception):
+            if not current:
+                return
+            conn = current[0]
+            if not conn.alive or not await conn.ping():
+                await self._discard(conn)
+
+        return await call_with_retry(
+            attempt,
+            breaker=self.circuit_breaker,
+            idempotent=self.is_idempotent(tool_name),
+            description=f"MCP call {tool_name} on {self.name}",
+            on_failure=drop_connection,
+            deadline=timeout,
+        )
+
+    async def close(self):
+        """Close the connection and stop health checks"""
+        self._closed = True
+        if self._health_task:
+            self._health_task.cancel()
+        async with self._lock:
+            conn, self._connection = self._connection, None
+        if conn:
+            await conn.close()
+
+    def get_stats(self) -> dict:
+        conn = self._connection
+        return {
+            "connected": bool(conn and conn.alive),
+            "in_flight": conn.in_flight if conn else 0,
+            "circuit": self.circuit_breaker.state,
+        }
+
+    async def _get_connection(self) -> _PooledConnection:
+        async with self._lock:
+            if self._closed:
+                raise RuntimeError(f"MCP connection to {self.name} is closed")
+            if self._connection and self._connection.alive:
+                return self._connection
+            if self._connection:
+                await self._connection.close()
+                self._connection = None
+            conn = _PooledConnection(MCPServerSse(self.params, cache_tools_list=True, name=self.name))
+            await conn.open(MCP_POOL_CONNECT_TIMEOUT)
+            self._connection = conn
+            logger.info(f"Opened MCP connection to {self.name}")
+            return conn
+
+    async def _discard(self, conn: _PooledConnection):
+        async with self._lock:
+            if self._connection is not conn:
+                return
+            self._connection = None
+        await conn.close()
+        logger.info(f"Recycled MCP connection to {self.name}")
+
+    async def _health_loop(self):
+        while not self._closed:
+            await asyncio.sleep(self.health_interval)
+            conn = self._connection
+            if conn and conn.in_flight:
+                continue
+            if conn and conn.alive and await conn.ping():
+                continue
+            if conn:
+                await self._discard(conn)
+            try:
+                await self._get_connection()
+            except Exception as e:
+                logger.error(f"Could not reopen MCP connection to {self.name}: {e}")
+
+
+class PooledMCPServer(MCPServer):
+    """
+    MCPServer handle for one job, backed by its own connection pool.
+
+    connect() opens the pool and cleanup() closes it, so call cleanup() when
+    the job ends.
+    """
+    def __init__(self, params: MCPServerSseParams, name: Optional[str] = None,
+                 idempotent_tools: Optional[Iterable[str]] = None,
+                 tool_timeouts: Optional[Dict[str, float]] = None,
+                 default_tool_timeout: Optional[float] = None):
+        """
+        Args:
+            params: The params that configure the server including the URL, headers,
+                   timeout, and SSE read timeout.
+            name: A readable name for the server.
+            idempotent_tools: Names of tools that are safe to replay after a dropped connection.
+            tool_timeouts: Deadline in seconds for specific tools, keyed by tool name.
+            default_tool_timeout: Deadline in seconds for tools without their own, or None.
+        """
+        self.params = params
+        self.idempotent_tools = idempotent_tools
+        self.tool_timeouts = dict(tool_timeouts or {})
+        self.default_tool_timeout = default_tool_timeout
+        self._name = name or f"SSE Server at {self.params.get('url', 'unknown')}"
+        self._pool: Optional[MCPConnectionPool] = None
+        self.connected = False
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    async def connect(self):
+        if self.connected:
+            return
+        pool = MCPConnectionPool(self.params, self._name, idempotent_tools=self.idempotent_tools)
+        await pool.open()
+        self._pool = pool
+        self.connected = True
+
+    async def list_tools(self) -> List[MCPTool]:
+        if not self._pool:
+            raise RuntimeError("Server not initialized. Make sure you call connect() first.")
+        return await self._pool.list_tools()
+
+    async def call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None,
+                        timeout: Optional[float] = None) -> CallToolResult:
+        if not self._pool:
+            raise RuntimeError("Server not initialized. Make sure you call connect() first.")
+        return await self._pool.call_tool(tool_name, arguments, timeout)
+
+    async def cleanup(self):
+        if not self._pool:
+            return
+        pool, self._pool = self._pool, None
+        self.connected = False
+        await pool.close()
+        logger.info(f"Closed pooled MCP server: {self.name}")
@@ -0,0 +1,232 @@
+"""
+Retry, backoff and circuit breaking for MCP tool calls.
+
+Transport failures (dropped SSE stream, unanswered request) are retried with
+jittered exponential backoff, but only for calls that are safe to replay.
+Each attempt is expected to re-establish the connection itself if the
+previous attempt left it broken. Errors returned by the server itself (McpError)
+mean the server is up and are raised straight away, except for the codes the
+client session uses for transport failures (connection closed, read timeout).
+A call that runs past its caller's deadline raises ToolDeadlineError and is not
+counted against the server: the deadline is the caller's budget, not a sign
+that the server is down.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+import httpx
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+logger = logging.getLogger(__name__)
+
+# Attempts per call (first try included) and the jittered backoff between them
+MCP_RETRY_ATTEMPTS = int(os.environ.get("MCP_RETRY_ATTEMPTS", "3"))
+MCP_RETRY_BASE_DELAY = float(os.environ.get("MCP_RETRY_BASE_DELAY", "0.25"))
+MCP_RETRY_MAX_DELAY = float(os.environ.get("MCP_RETRY_MAX_DELAY", "2"))
+# Seconds one attempt may wait for a response before the connection is treated as dead
+MCP_CALL_ATTEMPT_TIMEOUT = float(os.environ.get("MCP_CALL_ATTEMPT_TIMEOUT", "20"))
+# Seconds a connection gets to answer a ping after a timed-out call before it is replaced
+MCP_PING_TIMEOUT = float(os.environ.get("MCP_PING_TIMEOUT", "5"))
+# Consecutive transport failures that open the circuit, and seconds it stays open
+MCP_BREAKER_THRESHOLD = int(os.environ.get("MCP_BREAKER_THRESHOLD", "3"))
+MCP_BREAKER_RESET_TIMEOUT = float(os.environ.get("MCP_BREAKER_RESET_TIMEOUT", "15"))
+
+# McpError codes raised by the client session itself when the stream closes
+# mid-request or no response arrives within the session read timeout
+TRANSPORT_ERROR_CODES = {CONNECTION_CLOSED, httpx.codes.REQUEST_TIMEOUT}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a server whose circuit is open"""
+
+
+class ToolDeadlineError(asyncio.TimeoutError):
+    """Raised when a call runs past the deadline its caller set"""
+
+
+class CircuitBreaker:
+    """
+    Fails fast while a server is down.
+
+    After `threshold` consecutive failures the circuit opens and calls are
+    rejected for `reset_timeout` seconds. Then a single trial call is let
+    through; success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, name: str, threshold: int = MCP_BREAKER_THRESHOLD,
+                 reset_timeout: float = MCP_BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """
+        Raise CircuitOpenError unless a call may go through now
+
+        Returns:
+            True if the call is the half-open trial call
+        """
+        state = self.state
+        if state == "closed":
+            return False
+        if state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        raise CircuitOpenError(f"MCP server {self.name} is unavailable; retrying in {retry_in:.0f}s")
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info(f"MCP server {self.name} recovered; circuit closed")
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def abandon_trial(self):
+        """Let another trial call through after one was cancelled before it finished"""
+        self._trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        trial_failed = self._trial_running
+        self._trial_running = False
+        if trial_failed or self.failures >= self.threshold:
+            if self.opened_at is None or trial_failed:
+                logger.warning(f"MCP server {self.name} failing; circuit open for {self.reset_timeout}s")
+            self.opened_at = time.monotonic()
+
+
+# on_failure callbacks left running after a deadline, kept referenced until done
+_background_tasks: set = set()
+
+
+def _run_in_background(callback: Awaitable[None], description: str):
+    async def run():
+        try:
+            await callback
+        except Exception as e:
+            logger.warning(f"Cleanup after {description} failed: {e}")
+
+    task = asyncio.ensure_future(run())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def backoff_delay(attempt: int, base: float = MCP_RETRY_BASE_DELAY, cap: float = MCP_RETRY_MAX_DELAY) -> float:
+    """Full-jitter exponential backoff for the given retry number (0-based)"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def is_transport_error(error: BaseException) -> bool:
+    """Whether an McpError reports a failed transport rather than a server-side error"""
+    return isinstance(error, McpError) and error.error.code in TRANSPORT_ERROR_CODES
+
+
+def is_idempotent_tool(tool: Any) -> bool:
+    """Whether an MCP tool declares itself safe to call more than once"""
+    annotations = getattr(tool, "annotations", None)
+    return bool(
+        annotations
+        and (getattr(annotations, "readOnlyHint", False) or getattr(annotations, "idempotentHint", False))
+    )
+
+
+def find_idempotent_tools(tools: Optional[Iterable[Any]]) -> set:
+    return {tool.name for tool in tools or [] if is_idempotent_tool(tool)}
+
+
+async def call_with_retry(
+    call: Callable[[], Awaitable[Any]],
+    breaker: CircuitBreaker,
+    idempotent: bool,
+    description: str,
+    on_failure: Optional[Callable[[Exception], Awaitable[None]]] = None,
+    attempts: int = MCP_RETRY_ATTEMPTS,
+    attempt_timeout: Optional[float] = MCP_CALL_ATTEMPT_TIMEOUT,
+    deadline: Optional[float] = None,
+) -> Any:
+    """
+    Run an MCP request, replaying it on transport failures.
+
+    Args:
+        call: Makes one attempt of the request, reconnecting first if needed
+        breaker: Circuit breaker for the server
+        idempotent: Whether the request may be replayed after a failed attempt
+        description: Used in log messages
+        on_failure: Awaited after a failed attempt, e.g. to mark the connection for reconnecting
+        attempts: Maximum attempts, including the first
+        attempt_timeout: Seconds to wait for each attempt's response, or None for no limit
+        deadline: Seconds for the whole call including retries, or None for no limit.
+                  An attempt cut short by the deadline raises ToolDeadlineError
+                  without counting against the circuit breaker; on_failure still
+                  runs, in the background, so the caller isn't held past it.
+
+    Returns:
+        The result of the first successful attempt
+    """
+    loop = asyncio.get_running_loop()
+    expires_at = loop.time() + deadline if deadline is not None else None
+    attempt = 0
+    while True:
+        timeout = attempt_timeout
+        deadline_bound = False
+        if expires_at is not None:
+            remaining = expires_at - loop.time()
+            deadline_bound = timeout is None or remaining < timeout
+            if deadline_bound:
+                timeout = remaining
+        trial = breaker.before_call()
+        try:
+            result = await asyncio.wait_for(call(), timeout)
+        except Exception as e:
+            if isinstance(e, McpError) and not is_transport_error(e):
+                breaker.record_success()
+                raise
+            if deadline_bound and isinstance(e, asyncio.TimeoutError):
+                # The caller's deadline ran out, which says nothing about the
+                # server's health: record neither success nor failure
+                if trial:
+                    breaker.abandon_trial()
+                if on_failure:
+                    _run_in_background(on_failure(e), description)
+                raise ToolDeadlineError(f"{description} ran past its {deadline}s deadline") from e
+            breaker.record_failure()
+            if on_failure:
+                await on_failure(e)
+            attempt += 1
+            if not idempotent or attempt >= attempts or breaker.state == "open":
+                raise
+            delay = backoff_delay(attempt - 1)
+            if expires_at is not None and loop.time() + delay >= expires_at:
+                raise
+            logger.warning(
+                f"{description} failed ({e or type(e).__name__}); "
+                f"retrying in {delay * 1000:.0f} ms (attempt {attempt + 1}/{attempts})"
+            )
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            # Cancelled mid-attempt: the outcome is unknown, so record neither
+            # success nor failure, but don't leave the half-open trial claimed
+            if trial:
+                breaker.abandon_trial()
+            raise
+        breaker.record_success()
+        return result
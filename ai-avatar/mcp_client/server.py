@@ -1,6 +1,6 @@
 import asyncio
 from contextlib import AbstractAsyncContextManager, AsyncExitStack
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import logging
 
 # Import from the installed mcp package
@@ -10,8 +10,15 @@ from mcp.types import CallToolResult, JSONRPCMessage, Tool as MCPTool
 from mcp.client.sse import sse_client
 from mcp.client.session import ClientSession
 
+from .resilience import MCP_PING_TIMEOUT, CircuitBreaker, call_with_retry, find_idempotent_tools
+from .tool_cache import tool_schema_cache
+
 # Base class for MCP servers
 class MCPServer:
+    # Deadlines for tool calls in seconds: per tool name, and for every other tool (None for no deadline)
+    tool_timeouts: Dict[str, float] = {}
+    default_tool_timeout: Optional[float] = None
+
     async def connect(self):
         """Connect to the server."""
         raise NotImplementedError
@@ -25,19 +32,24 @@ class MCPServer:
         """List the tools available on the server."""
         raise NotImplementedError
 
-    async def call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None) -> CallToolResult:
-        """Invoke a tool on the server."""
+    async def call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None,
+                        timeout: Optional[float] = None) -> CallToolResult:
+        """Invoke a tool on the server, giving up after timeout seconds (None for no deadline)."""
         raise NotImplementedError
 
     async def cleanup(self):
         """Cleanup the server."""
         raise NotImplementedError
 
+    def get_tool_timeout(self, tool_name: str) -> Optional[float]:
+        """Deadline in seconds for a call to this tool, or None for no deadline."""
+        return self.tool_timeouts.get(tool_name, self.default_tool_timeout)
+
 # Base class for MCP servers that use a ClientSession
 class _MCPServerWithClientSession(MCPServer):
     """Base class for MCP servers that use a ClientSession to communicate with the server."""
 
-    def __init__(self, cache_tools_list: bool):
+    def __init__(self, cache_tools_list: bool, idempotent_tools: Optional[Iterable[str]] = None):
         """
         Args:
             cache_tools_list: Whether to cache the tools list. If True, the tools list will be
@@ -45,6 +57,8 @@ class _MCPServerWithClientSession(MCPServer):
             fetched from the server on each call to list_tools(). You should set this to True
             if you know the server will not change its tools list, because it can drastically
             improve latency.
+            idempotent_tools: Names of tools that are safe to replay after a dropped
+            connection, in addition to tools annotated as read-only or idempotent.
         """
         self.session: Optional[ClientSession] = None
         self.exit_stack: AsyncExitStack = AsyncExitStack()
@@ -56,6 +70,17 @@ class _MCPServerWithClientSession(MCPServer):
         self._tools_list: Optional[List[MCPTool]] = None
         self.logger = logging.getLogger(__name__)
 
+        # Key for the process-wide tool schema cache (set by subclasses that can
+        # identify their server), and the server version reported at initialize
+        self.tools_cache_key: Optional[str] = None
+        self.server_version: Optional[str] = None
+
+        # Reconnect and retry state for call_tool
+        self.idempotent_tools = set(idempotent_tools or [])
+        self._circuit_breaker: Optional[CircuitBreaker] = None
+        self._needs_reconnect = False
+        self._reconnect_lock: asyncio.Lock = asyncio.Lock()
+
     def create_streams(
         self,
     ) -> AbstractAsyncContextManager[
@@ -84,7 +109,8 @@ class _MCPServerWithClientSession(MCPServer):
             transport = await self.exit_stack.enter_async_context(self.create_streams())
             read, write = transport
             session = await self.exit_stack.enter_async_context(ClientSession(read, write))
-            await session.initialize()
+            result = await session.initialize()
+            self.server_version = getattr(getattr(result, "serverInfo", None), "version", None)
             self.session = session
             self.logger.info(f"Connected to MCP server: {self.name}")
         except Exception as e:
@@ -94,13 +120,23 @@ class _MCPServerWithClientSession(MCPServer):
 
     async def list_tools(self) -> List[MCPTool]:
         """List the tools available on the server."""
-        if not self.session:
-            raise RuntimeError("Server not initialized. Make sure you call connect() first.")
-
         # Return from cache if caching is enabled, we have tools, and the cache is not dirty
         if self.cache_tools_list and not self._cache_dirty and self._tools_list:
             return self._tools_list
 
+        # Serve the tools list shared by other sessions with the same server
+        if self.cache_tools_list and self.tools_cache_key:
+            tools = self._get_shared_tools()
+            if tools is not None:
+                return tools
+
+        return await self.refresh_tools()
+
+    async def refresh_tools(self) -> List[MCPTool]:
+        """Fetch the tools list from the server, bypassing the caches, and update them."""
+        if not self.session:
+            raise RuntimeError("Server not initialized. Make sure you call connect() first.")
+
         # Reset the cache dirty to False
         self._cache_dirty = False
 
@@ -108,13 +144,114 @@ class _MCPServerWithClientSession(MCPServer):
             # Fetch the tools from the server
             result = await self.session.list_tools()
             self._tools_list = result.tools
+            if self.cache_tools_list and self.tools_cache_key:
+                tool_schema_cache.set(self.tools_cache_key, self._tools_list, self.server_version)
             return self._tools_list
         except Exception as e:
             self.logger.error(f"Error listing tools: {e}")
             raise
 
-    async def call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None) -> CallToolResult:
-        """Invoke a tool on the server."""
+    def _get_shared_tools(self) -> Optional[List[MCPTool]]:
+        """
+        Tools from the process-wide cache, or None if they must be fetched now.
+
+        A stale entry is still returned and refreshed in the background. An entry
+        recorded for a different server version is ignored.
+        """
+        entry = tool_schema_cache.get(self.tools_cache_key)
+        if not entry:
+            return None
+        if self.server_version and entry["server_version"] not in (None, self.server_version):
+            self.logger.info(
+                f"MCP server {self.name} version changed "
+                f"({entry['server_version']} -> {self.server_version}), refetching tools"
+            )
+            return None
+
+        self._tools_list = entry["tools"]
+        self._cache_dirty = False
+        if entry["stale"] and self.session:
+            tool_schema_cache.refresh_in_background(self.tools_cache_key, self._refresh_shared_tools)
+        return self._tools_list
+
+    async def _refresh_shared_tools(self):
+        """Refetch the tools list and update the shared cache if the schema changed."""
+        try:
+            result = await self.session.list_tools()
+        except Exception as e:
+            self.logger.warning(f"Background tools refresh failed for {self.name}: {e}")
+            return
+        if tool_schema_cache.set(self.tools_cache_key, result.tools, self.server_version):
+            self._tools_list = result.tools
+            self.logger.info(f"MCP tool schema changed for {self.name}; cache updated")
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        if not self._circuit_breaker:
+            self._circuit_breaker = CircuitBreaker(self.name)
+        return self._circuit_breaker
+
+    def is_idempotent(self, tool_name: str) -> bool:
+        """Whether a call to this tool may be replayed after a transport failure."""
+        return tool_name in self.idempotent_tools or tool_name in find_idempotent_tools(self._tools_list)
+
+    async def call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None,
+                        timeout: Optional[float] = None) -> CallToolResult:
+        """
+        Invoke a tool on the server.
+
+        If the connection drops, the next attempt reconnects first. Idempotent tools
+        are replayed with jittered backoff, and the circuit breaker fails calls fast
+        while the server keeps failing. A call still running at the timeout raises
+        ToolDeadlineError; the connection is reconnected before the next call only
+        if it then fails to answer a ping.
+        """
+        if not self.session and not self._needs_reconnect:
+            raise RuntimeError("Server not initialized. Make sure you call connect() first.")
+
+        async def attempt() -> CallToolResult:
+            if self._needs_reconnect:
+                await self.reconnect()
+            return await self.call_tool_once(tool_name, arguments)
+
+        async def mark_broken(error: Exception):
+            if isinstance(error, asyncio.TimeoutError) and await self.ping(MCP_PING_TIMEOUT):
+                return
+            self._needs_reconnect = True
+
+        return await call_with_retry(
+            attempt,
+            breaker=self.circuit_breaker,
+            idempotent=self.is_idempotent(tool_name),
+            description=f"MCP call {tool_name} on {self.name}",
+            on_failure=mark_broken,
+            deadline=timeout,
+        )
+
+    async def reconnect(self):
+        """Replace a broken connection with a new one."""
+        async with self._reconnect_lock:
+            if not self._needs_reconnect:
+                return
+            await self.cleanup()
+            self.exit_stack = AsyncExitStack()
+            await self.connect()
+            self._needs_reconnect = False
+            self.logger.info(f"Reconnected to MCP server: {self.name}")
+
+    async def ping(self, timeout: float) -> bool:
+        """Whether the current connection answers a ping within the timeout."""
+        if not self.session:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception as e:
+            self.logger.warning(f"MCP server {self.name} did not answer a ping: {e}")
+            return False
+
+    async def call_tool_once(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None) -> CallToolResult:
+        """Invoke a tool on the current connection, without reconnecting or retrying."""
         if not self.session:
             raise RuntimeError("Server not initialized. Make sure you call connect() first.")
 
@@ -148,6 +285,9 @@ class MCPServerSse(_MCPServerWithClientSession):
         params: MCPServerSseParams,
         cache_tools_list: bool = False,
         name: Optional[str] = None,
+        idempotent_tools: Optional[Iterable[str]] = None,
+        tool_timeouts: Optional[Dict[str, float]] = None,
+        default_tool_timeout: Optional[float] = None,
     ):
         """Create a new MCP server based on the HTTP with SSE transport.
 
@@ -156,10 +296,16 @@ class MCPServerSse(_MCPServerWithClientSession):
                    timeout, and SSE read timeout.
             cache_tools_list: Whether to cache the tools list.
             name: A readable name for the server.
+            idempotent_tools: Names of tools that are safe to replay after a dropped connection.
+            tool_timeouts: Deadline in seconds for specific tools, keyed by tool name.
+            default_tool_timeout: Deadline in seconds for tools without their own, or None.
         """
-        super().__init__(cache_tools_list)
+        super().__init__(cache_tools_list, idempotent_tools)
+        self.tool_timeouts = dict(tool_timeouts or {})
+        self.default_tool_timeout = default_tool_timeout
         self.params = params
         self._name = name or f"SSE Server at {self.params.get('url', 'unknown')}"
+        self.tools_cache_key = self.params.get("url")
 
     def create_streams(
         self,
@@ -212,7 +358,8 @@ class MCPServerStdio(MCPServer):
             self._tools_cache = tools
         return tools
 
-    async def call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None,
+                        timeout: Optional[float] = None) -> Dict[str, Any]:
         return {"content": [f"Called {tool_name} with args {arguments} via Stdio"]}
 
     async def cleanup(self):
@@ -0,0 +1,166 @@
+"""
+MCP tool schema cache shared by every server instance in the process.
+Entries are keyed by server URL and persisted to SQLite so new worker
+processes start with the last known tool list.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from mcp.types import Tool as MCPTool
+
+logger = logging.getLogger(__name__)
+
+# Seconds before a cached tool list is refreshed in the background
+MCP_TOOL_CACHE_TTL = int(os.environ.get("MCP_TOOL_CACHE_TTL", "3600"))
+MCP_TOOL_CACHE_PATH = os.environ.get("MCP_TOOL_CACHE_PATH", "mcp_tool_cache.sqlite3")
+
+
+def hash_tools(tools: List[MCPTool]) -> str:
+    """Stable hash of a tool list, used to detect schema changes"""
+    payload = json.dumps(
+        [tool.model_dump(mode="json") for tool in tools],
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ToolSchemaCache:
+    """
+    Process-wide cache of MCP tool lists keyed by server URL.
+
+    Each entry records the tools, their hash, the server version reported at
+    initialize time and when the list was fetched. Entries older than the TTL
+    are still served; the caller refreshes them in the background.
+    """
+
+    def __init__(self, ttl: int = MCP_TOOL_CACHE_TTL, path: Optional[str] = MCP_TOOL_CACHE_PATH):
+        """
+        Args:
+            ttl: Seconds before an entry is considered stale
+            path: SQLite file for the disk tier, or None to disable it
+        """
+        self.ttl = ttl
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._db = None
+
+        if path:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS tool_schemas ("
+                    "url TEXT PRIMARY KEY, "
+                    "tools TEXT NOT NULL, "
+                    "schema_hash TEXT NOT NULL, "
+                    "server_version TEXT, "
+                    "fetched_at REAL NOT NULL)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"MCP tool schema disk cache disabled: {e}")
+                self._db = None
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the cached tool list for a server.
+
+        Returns:
+            Entry with 'tools', 'hash', 'server_version', 'fetched_at' and 'stale' keys, or None
+        """
+        with self._lock:
+            entry = self._entries.get(url) or self._load(url)
+            if not entry:
+                return None
+            self._entries[url] = entry
+            return {**entry, "stale": time.time() - entry["fetched_at"] > self.ttl}
+
+    def set(self, url: str, tools: List[MCPTool], server_version: Optional[str] = None) -> bool:
+        """
+        Store a freshly fetched tool list.
+
+        Returns:
+            True if the schema differs from the previously cached one
+        """
+        schema_hash = hash_tools(tools)
+        entry = {
+            "tools": tools,
+            "hash": schema_hash,
+            "server_version": server_version,
+            "fetched_at": time.time(),
+        }
+        with self._lock:
+            previous = self._entries.get(url) or self._load(url)
+            self._entries[url] = entry
+            self._save(url, entry)
+        return not previous or previous["hash"] != schema_hash
+
+    def refresh_in_background(self, url: str, fetch) -> Optional[asyncio.Task]:
+        """
+        Run fetch() in a background task unless a refresh for this URL is already running.
+
+        Args:
+            url: Server URL the refresh is for
+            fetch: Coroutine function that fetches and stores the tool list
+        """
+        task = self._refreshing.get(url)
+        if task and not task.done():
+            return task
+        task = asyncio.create_task(fetch())
+        self._refreshing[url] = task
+
+        def forget(done: asyncio.Task):
+            if self._refreshing.get(url) is done:
+                del self._refreshing[url]
+
+        task.add_done_callback(forget)
+        return task
+
+    def _load(self, url: str) -> Optional[Dict[str, Any]]:
+        if not self._db:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT tools, schema_hash, server_version, fetched_at FROM tool_schemas WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if not row:
+                return None
+            return {
+                "tools": [MCPTool.model_validate(tool) for tool in json.loads(row[0])],
+                "hash": row[1],
+                "server_version": row[2],
+                "fetched_at": row[3],
+            }
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Error reading MCP tool schema cache: {e}")
+            return None
+
+    def _save(self, url: str, entry: Dict[str, Any]):
+        if not self._db:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO tool_schemas VALUES (?, ?, ?, ?, ?)",
+                (
+                    url,
+                    json.dumps([tool.model_dump(mode="json") for tool in entry["tools"]]),
+                    entry["hash"],
+                    entry["server_version"],
+                    entry["fetched_at"],
+                ),
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error writing MCP tool schema cache: {e}")
+
+
+tool_schema_cache = ToolSchemaCache()
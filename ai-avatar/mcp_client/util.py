@@ -1,12 +1,39 @@
 import asyncio
 import json
 import functools
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 # Import from mcp libraries
 from mcp.types import Tool as MCPTool, CallToolResult
+from .resilience import CircuitOpenError
 from .server import MCPServer
 
+
+def tool_timeout_result(tool_name: str, timeout: float) -> str:
+    """Structured result returned to the LLM when a tool misses its deadline"""
+    return json.dumps({
+        "status": "timeout",
+        "tool": tool_name,
+        "timeout_seconds": timeout,
+        "message": (
+            "The tool did not respond in time. Briefly tell the learner it is taking "
+            "longer than expected, offer to try again, and carry on with the session."
+        ),
+    })
+
+
+def tool_unavailable_result(tool_name: str, reason: str) -> str:
+    """Structured result returned to the LLM when the tool's server is unavailable"""
+    return json.dumps({
+        "status": "unavailable",
+        "tool": tool_name,
+        "reason": reason,
+        "message": (
+            "This feature is temporarily unavailable. Tell the learner briefly and "
+            "continue without it."
+        ),
+    })
+
 # A minimal FunctionTool class used by the agent.
 class FunctionTool:
     def __init__(self, name: str, description: str, params_json_schema: Dict[str, Any], on_invoke_tool, strict_json_schema: bool = False):
@@ -46,14 +73,29 @@ class MCPUtil:
                             prop_schema['additionalProperties'] = False
 
         # Use a default argument to capture the current tool correctly in the closure
-        async def invoke_tool(context: Any, input_json: str, current_tool_name=tool.name) -> str:
+        async def invoke_tool(context: Any, input_json: str, current_tool_name=tool.name) -> Optional[str]:
+            """
+            Calls the tool within its deadline. If context has a speech_handle (a LiveKit
+            RunContext) and the user interrupts, the call is cancelled and None is returned.
+            """
             try:
                 arguments = json.loads(input_json) if input_json else {}
             except Exception as e:
                 # Return error message as string
                 return f"Error parsing input JSON for tool '{current_tool_name}': {e}"
+            timeout = server.get_tool_timeout(current_tool_name)
+            # The deadline is enforced inside call_tool so a timed-out call counts
+            # against the circuit breaker and its connection is replaced
+            call = asyncio.ensure_future(
+                server.call_tool(current_tool_name, arguments, timeout=timeout)
+            )
             try:
-                result = await server.call_tool(current_tool_name, arguments)
+                speech_handle = getattr(context, "speech_handle", None)
+                if speech_handle is not None:
+                    await speech_handle.wait_if_not_interrupted([call])
+                    if speech_handle.interrupted:
+                        return None
+                result = await call
                 # Ensure the final return value is a string
                 if "content" in result and isinstance(result["content"], list) and len(result["content"]) >= 1:
                      # Handle single or multiple content items - convert to string
@@ -80,9 +122,17 @@ class MCPUtil:
                         return json.dumps(result)
                     except TypeError:
                         return str(result) # Fallback
+            except asyncio.TimeoutError:
+                return tool_timeout_result(current_tool_name, timeout)
+            except CircuitOpenError as e:
+                return tool_unavailable_result(current_tool_name, str(e))
             except Exception as e:
                  # Catch errors during tool call itself
                  return f"Error calling tool '{current_tool_name}': {e}"
+            finally:
+                # Cancel the call if the turn was interrupted or this task was cancelled
+                if not call.done():
+                    call.cancel()
 
         return FunctionTool(
             name=tool.name,
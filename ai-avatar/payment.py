@@ -7,7 +7,14 @@ from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 import stripe
 import os
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+import zlib
 import logging
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +22,16 @@ router = APIRouter()
 
 # Initialize Stripe with secret key
 stripe.api_key = os.environ.get("STRIPE_SECRET_KEY")
+
+# Route handlers use the SDK's *_async methods so Stripe round-trips don't
+# block the event loop. One shared HTTPX client reuses connections, and every
+# call is bounded by STRIPE_TIMEOUT.
+STRIPE_TIMEOUT = float(os.environ.get("STRIPE_TIMEOUT", "10"))
+stripe.max_network_retries = int(os.environ.get("STRIPE_MAX_NETWORK_RETRIES", "2"))
+stripe.default_http_client = stripe.HTTPXClient(
+    timeout=STRIPE_TIMEOUT,
+    allow_sync_methods=True,
+)
 STRIPE_WEBHOOK_SECRET = os.environ.get("STRIPE_WEBHOOK_SECRET")
 FRONTEND_URL = os.environ.get("FRONTEND_URL", "http://localhost:3081")
 
@@ -25,6 +42,377 @@ PRICE_IDS = {
 }
 
 
+# Subscription status is served from a local store kept current by webhooks;
+# entries older than this are re-checked against Stripe
+SUBSCRIPTION_CACHE_TTL = int(os.environ.get("SUBSCRIPTION_CACHE_TTL", "900"))
+# Most customers/emails kept in memory; the least recently used are evicted
+SUBSCRIPTION_CACHE_SIZE = int(os.environ.get("SUBSCRIPTION_CACHE_SIZE", "10000"))
+
+
+class SubscriptionStore:
+    """
+    In-memory subscription state keyed by customer ID, with an email index.
+    Updated from Stripe webhooks and from Stripe lookups on a cache miss.
+    Each index is a size-bounded LRU, so lookups for unknown emails can't
+    grow it without limit.
+    """
+
+    def __init__(self, ttl: int = SUBSCRIPTION_CACHE_TTL, max_size: int = SUBSCRIPTION_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._by_customer: OrderedDict[str, dict] = OrderedDict()
+        self._by_email: OrderedDict[str, dict] = OrderedDict()
+        self._customer_emails: OrderedDict[str, str] = OrderedDict()
+
+    def _put(self, index: OrderedDict, key: str, value):
+        index[key] = value
+        index.move_to_end(key)
+        while len(index) > self.max_size:
+            index.popitem(last=False)
+
+    def get(self, email: str) -> dict | None:
+        """Return the stored status response for an email, or None if missing/stale"""
+        email = email.lower()
+        entry = self._by_email.get(email)
+        if not entry:
+            return None
+        if entry["updated_at"] + self.ttl <= time.time():
+            del self._by_email[email]
+            return None
+        self._by_email.move_to_end(email)
+        return entry["status"]
+
+    def link_customer(self, customer_id: str, email: str, subscription_id: str | None = None) -> bool:
+        """
+        Remember which email a Stripe customer belongs to
+
+        Returns:
+            True if the customer's stored state (for subscription_id, if given)
+            now answers lookups by email too
+        """
+        email = email.lower()
+        self._put(self._customer_emails, customer_id, email)
+        entry = self._by_customer.get(customer_id)
+        if not entry or subscription_id not in (None, entry["subscription_id"]):
+            return False
+        self._put(self._by_email, email, entry)
+        return True
+
+    def set(self, email: str | None, customer_id: str | None, status: dict,
+            subscription_id: str | None = None):
+        """Store a status response for a customer and/or email"""
+        entry = {
+            "status": status,
+            "subscription_id": subscription_id,
+            "updated_at": time.time(),
+        }
+        if customer_id:
+            self._put(self._by_customer, customer_id, entry)
+            email = email or self._customer_emails.get(customer_id)
+            if email:
+                self._put(self._customer_emails, customer_id, email.lower())
+        if email:
+            self._put(self._by_email, email.lower(), entry)
+
+    def invalidate(self, email: str | None = None, customer_id: str | None = None):
+        """Drop stored state so the next lookup goes to Stripe"""
+        if customer_id:
+            self._by_customer.pop(customer_id, None)
+            email = email or self._customer_emails.get(customer_id)
+        if email:
+            self._by_email.pop(email.lower(), None)
+
+    def apply_subscription(self, subscription) -> None:
+        """Update the store from a customer.subscription.* webhook object"""
+        customer_id = subscription["customer"]
+        current = self._by_customer.get(customer_id)
+        if subscription["status"] != "active" and current and \
+                current["subscription_id"] not in (None, subscription["id"]):
+            # A different subscription is the customer's active one; leave it alone
+            return
+        if subscription["status"] == "active":
+            status = build_subscription_status(subscription)
+        else:
+            status = build_free_status("no_active_subscription")
+        self.set(None, customer_id, status, subscription_id=subscription["id"])
+
+
+def build_free_status(status: str) -> dict:
+    """Status response for a customer without an active subscription"""
+    return {
+        "has_subscription": False,
+        "plan": "free",
+        "status": status,
+    }
+
+
+def build_subscription_status(subscription) -> dict:
+    """Project an active Stripe subscription onto the status response"""
+    price_id = subscription["items"]["data"][0]["price"]["id"]
+
+    # Determine plan name from price ID
+    plan = "unknown"
+    for plan_name, pid in PRICE_IDS.items():
+        if pid == price_id:
+            plan = plan_name
+            break
+
+    return {
+        "has_subscription": True,
+        "plan": plan,
+        "status": subscription["status"],
+        "current_period_end": subscription["current_period_end"],
+        "cancel_at_period_end": subscription["cancel_at_period_end"],
+    }
+
+
+subscription_store = SubscriptionStore()
+
+
+# Projected checkout sessions for the payment success page
+CHECKOUT_SESSION_CACHE_TTL = int(os.environ.get("CHECKOUT_SESSION_CACHE_TTL", "600"))
+CHECKOUT_SESSION_CACHE_SIZE = 1024
+
+
+class CheckoutSessionCache:
+    """Short-lived, size-bounded cache of success page responses keyed by session ID"""
+
+    def __init__(self, ttl: int = CHECKOUT_SESSION_CACHE_TTL, max_size: int = CHECKOUT_SESSION_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+
+    def get(self, session_id: str) -> dict | None:
+        entry = self._entries.get(session_id)
+        if not entry:
+            return None
+        if entry[1] <= time.time():
+            del self._entries[session_id]
+            return None
+        return entry[0]
+
+    def set(self, session_id: str, response: dict):
+        self._entries[session_id] = (response, time.time() + self.ttl)
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+def build_checkout_session_response(session) -> dict:
+    """Project a checkout session (expanded or not) onto the success page response"""
+    subscription = session.get("subscription")
+    return {
+        "customer_email": session.get("customer_email")
+            or (session.get("customer_details") or {}).get("email"),
+        "payment_status": session.get("payment_status"),
+        "subscription_id": subscription.get("id")
+            if isinstance(subscription, dict) else subscription,
+        "amount_total": session.get("amount_total"),
+        "currency": session.get("currency"),
+    }
+
+
+checkout_session_cache = CheckoutSessionCache()
+
+
+# Webhook pipeline: intake verifies, records the event ID and enqueues, then
+# acknowledges; background workers apply events. Events are sharded by customer
+# so each customer's events are applied in order.
+STRIPE_WEBHOOK_WORKERS = int(os.environ.get("STRIPE_WEBHOOK_WORKERS", "4"))
+STRIPE_WEBHOOK_QUEUE_SIZE = int(os.environ.get("STRIPE_WEBHOOK_QUEUE_SIZE", "10000"))
+STRIPE_EVENT_LEDGER_PATH = os.environ.get("STRIPE_EVENT_LEDGER_PATH", "stripe_events.sqlite3")
+# Seconds event IDs are kept; Stripe stops redelivering an event after 3 days
+STRIPE_EVENT_LEDGER_RETENTION = int(os.environ.get("STRIPE_EVENT_LEDGER_RETENTION", str(7 * 24 * 3600)))
+# Seconds shutdown waits for queued events to be applied
+STRIPE_WEBHOOK_DRAIN_TIMEOUT = float(os.environ.get("STRIPE_WEBHOOK_DRAIN_TIMEOUT", "10"))
+STRIPE_EVENT_LEDGER_PRUNE_INTERVAL = 3600
+
+
+class StripeEventLedger:
+    """
+    Idempotency ledger of Stripe event IDs that have been accepted, so
+    redelivered events are acknowledged without being processed again.
+    Stored in SQLite, or in memory if the database can't be opened. IDs older
+    than the retention period are pruned, at most once per prune interval.
+    Methods block on SQLite, so call them from the event loop through an executor.
+    """
+
+    def __init__(self, path: str | None = STRIPE_EVENT_LEDGER_PATH,
+                 retention: int = STRIPE_EVENT_LEDGER_RETENTION):
+        self.retention = retention
+        self._seen: dict[str, float] = {}
+        self._pruned_at = 0.0
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS stripe_events ("
+                    "event_id TEXT PRIMARY KEY, "
+                    "event_type TEXT NOT NULL, "
+                    "received_at REAL NOT NULL)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Stripe event ledger is memory-only: {e}")
+                self._db = None
+
+    def record(self, event_id: str, event_type: str) -> bool:
+        """Record an event ID. Returns False if it was already recorded."""
+        now = time.time()
+        if now - self._pruned_at >= STRIPE_EVENT_LEDGER_PRUNE_INTERVAL:
+            self.prune(now - self.retention)
+        with self._lock:
+            if self._db:
+                try:
+                    cursor = self._db.execute(
+                        "INSERT OR IGNORE INTO stripe_events VALUES (?, ?, ?)",
+                        (event_id, event_type, now),
+                    )
+                    self._db.commit()
+                    return cursor.rowcount > 0
+                except sqlite3.Error as e:
+                    logger.error(f"Error writing Stripe event ledger: {e}")
+            if event_id in self._seen:
+                return False
+            self._seen[event_id] = now
+            return True
+
+    def prune(self, cutoff: float):
+        """Drop event IDs received before cutoff (a Unix timestamp)"""
+        with self._lock:
+            self._pruned_at = time.time()
+            self._seen = {event_id: received for event_id, received in self._seen.items() if received >= cutoff}
+            if self._db:
+                try:
+                    cursor = self._db.execute("DELETE FROM stripe_events WHERE received_at < ?", (cutoff,))
+                    self._db.commit()
+                    if cursor.rowcount:
+                        logger.info(f"Pruned {cursor.rowcount} old Stripe event IDs")
+                except sqlite3.Error as e:
+                    logger.error(f"Error pruning Stripe event ledger: {e}")
+
+    def forget(self, event_id: str):
+        """Remove an event ID so a redelivery is processed (used when it was not applied)"""
+        with self._lock:
+            self._seen.pop(event_id, None)
+            if self._db:
+                try:
+                    self._db.execute("DELETE FROM stripe_events WHERE event_id = ?", (event_id,))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Error updating Stripe event ledger: {e}")
+
+
+stripe_event_ledger = StripeEventLedger()
+webhook_queues: list[asyncio.Queue] = []
+webhook_workers: list[asyncio.Task] = []
+
+
+def get_event_shard_key(event) -> str:
+    """Customer the event belongs to (falls back to the object ID)"""
+    data_object = event["data"]["object"]
+    return data_object.get("customer") or data_object.get("id") or event["id"]
+
+
+def ensure_webhook_workers():
+    """Start the webhook consumers on the running event loop if needed"""
+    if webhook_workers:
+        return
+    for shard in range(STRIPE_WEBHOOK_WORKERS):
+        queue = asyncio.Queue(maxsize=STRIPE_WEBHOOK_QUEUE_SIZE)
+        webhook_queues.append(queue)
+        webhook_workers.append(asyncio.create_task(run_webhook_worker(shard, queue)))
+
+
+async def run_webhook_worker(shard: int, queue: asyncio.Queue):
+    """Apply queued webhook events one at a time"""
+    while True:
+        event = await queue.get()
+        try:
+            await process_stripe_event(event)
+        except asyncio.CancelledError:
+            # Stopped mid-event: let a redelivery apply it again. Called directly
+            # since the task is being cancelled; this only happens at shutdown.
+            stripe_event_ledger.forget(event["id"])
+            logger.error(f"Stripe event {event['id']} on shard {shard} was interrupted by shutdown")
+            raise
+        except Exception as e:
+            logger.error(f"Error processing Stripe event {event['id']} on shard {shard}: {e}")
+        finally:
+            queue.task_done()
+
+
+async def process_stripe_event(event):
+    """Apply a verified Stripe event to local state"""
+    event_type = event["type"]
+    logger.info(f"Processing Stripe event: {event_type}")
+
+    if event_type == "checkout.session.completed":
+        session = event["data"]["object"]
+        customer_email = session.get("customer_email") or session.get("customer_details", {}).get("email")
+        subscription_id = session.get("subscription")
+        customer_id = session.get("customer")
+        logger.info(
+            f"Payment successful! Email: {customer_email}, "
+            f"Subscription: {subscription_id}"
+        )
+        # Link the customer to the email. The subscription details arrive with
+        # customer.subscription.created/updated, before or after this event;
+        # until they do, refresh from Stripe
+        linked = False
+        if customer_id and customer_email:
+            linked = subscription_store.link_customer(customer_id, customer_email, subscription_id)
+        if not linked:
+            subscription_store.invalidate(email=customer_email, customer_id=customer_id)
+        # Pre-populate the success page lookup so it doesn't have to call Stripe
+        checkout_session_cache.set(session["id"], build_checkout_session_response(session))
+
+    elif event_type in ("customer.subscription.created", "customer.subscription.updated"):
+        subscription = event["data"]["object"]
+        logger.info(f"Subscription updated: {subscription['id']} → {subscription['status']}")
+        subscription_store.apply_subscription(subscription)
+
+    elif event_type == "customer.subscription.deleted":
+        subscription = event["data"]["object"]
+        logger.info(f"Subscription cancelled: {subscription['id']}")
+        subscription_store.apply_subscription(subscription)
+
+    elif event_type == "invoice.payment_failed":
+        invoice = event["data"]["object"]
+        logger.warning(f"Payment failed for invoice: {invoice['id']}")
+
+
+@router.on_event("shutdown")
+async def stop_webhook_workers():
+    """Apply the events still queued (up to STRIPE_WEBHOOK_DRAIN_TIMEOUT), then stop the workers"""
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(queue.join() for queue in webhook_queues)),
+            STRIPE_WEBHOOK_DRAIN_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        # They were acknowledged already, so take them out of the ledger to let a
+        # redelivery (or a resend from the Stripe dashboard) apply them
+        dropped = []
+        for queue in webhook_queues:
+            while not queue.empty():
+                dropped.append(queue.get_nowait()["id"])
+                queue.task_done()
+        loop = asyncio.get_running_loop()
+        for event_id in dropped:
+            await loop.run_in_executor(None, stripe_event_ledger.forget, event_id)
+        logger.error(f"Stopped with {len(dropped)} Stripe events unprocessed: {', '.join(dropped)}")
+    for worker in webhook_workers:
+        worker.cancel()
+    await asyncio.gather(*webhook_workers, return_exceptions=True)
+    webhook_workers.clear()
+    webhook_queues.clear()
+
+
 class CheckoutRequest(BaseModel):
     price_id: str
     user_email: str | None = None
@@ -68,7 +456,7 @@ async def create_checkout_session(request: CheckoutRequest):
         if request.user_email:
             session_params["customer_email"] = request.user_email
 
-        session = stripe.checkout.Session.create(**session_params)
+        session = await stripe.checkout.Session.create_async(**session_params)
 
         logger.info(f"Checkout session created: {session.id}")
         return {"url": session.url, "session_id": session.id}
@@ -85,7 +473,8 @@ async def create_checkout_session(request: CheckoutRequest):
 async def stripe_webhook(request: Request):
     """
     Handle Stripe webhook events.
-    Verifies the webhook signature and processes relevant events.
+    Verifies the webhook signature, drops redeliveries and queues new events
+    for background processing.
     """
     payload = await request.body()
     sig_header = request.headers.get("stripe-signature")
@@ -97,7 +486,6 @@ async def stripe_webhook(request: Request):
             )
         else:
             # In development without webhook secret, parse the event directly
-            import json
             event = stripe.Event.construct_from(
                 json.loads(payload), stripe.api_key
             )
@@ -108,34 +496,25 @@ async def stripe_webhook(request: Request):
         logger.error("Invalid webhook signature")
         raise HTTPException(status_code=400, detail="Invalid signature")
 
-    # Handle the event
+    # Acknowledge redeliveries without processing them again
+    event_id = event["id"]
     event_type = event["type"]
-    logger.info(f"Received Stripe event: {event_type}")
-
-    if event_type == "checkout.session.completed":
-        session = event["data"]["object"]
-        customer_email = session.get("customer_email") or session.get("customer_details", {}).get("email")
-        subscription_id = session.get("subscription")
-        logger.info(
-            f"Payment successful! Email: {customer_email}, "
-            f"Subscription: {subscription_id}"
-        )
-        # In a production app with a database, you would:
-        # 1. Find the user by email
-        # 2. Update their subscription status
-        # 3. Store the subscription_id for future reference
-
-    elif event_type == "customer.subscription.updated":
-        subscription = event["data"]["object"]
-        logger.info(f"Subscription updated: {subscription['id']} → {subscription['status']}")
-
-    elif event_type == "customer.subscription.deleted":
-        subscription = event["data"]["object"]
-        logger.info(f"Subscription cancelled: {subscription['id']}")
-
-    elif event_type == "invoice.payment_failed":
-        invoice = event["data"]["object"]
-        logger.warning(f"Payment failed for invoice: {invoice['id']}")
+    logger.info(f"Received Stripe event: {event_type} ({event_id})")
+    loop = asyncio.get_running_loop()
+    if not await loop.run_in_executor(None, stripe_event_ledger.record, event_id, event_type):
+        logger.info(f"Duplicate Stripe event ignored: {event_id}")
+        return {"status": "success"}
+
+    # Hand the event to the customer's worker and acknowledge immediately
+    ensure_webhook_workers()
+    shard = zlib.crc32(get_event_shard_key(event).encode()) % len(webhook_queues)
+    try:
+        webhook_queues[shard].put_nowait(event)
+    except asyncio.QueueFull:
+        # Let Stripe redeliver later instead of dropping the event
+        await loop.run_in_executor(None, stripe_event_ledger.forget, event_id)
+        logger.error(f"Webhook queue full, asking Stripe to retry: {event_id}")
+        raise HTTPException(status_code=503, detail="Webhook queue full")
 
     return {"status": "success"}
 
@@ -153,49 +532,37 @@ async def get_subscription_status(email: str):
                 detail="Stripe is not configured."
             )
 
+        # Serve from the webhook-maintained store; only go to Stripe on a miss or stale entry
+        cached = subscription_store.get(email)
+        if cached:
+            return cached
+
         # Search for customer by email
-        customers = stripe.Customer.list(email=email, limit=1)
+        customers = await stripe.Customer.list_async(email=email, limit=1)
 
         if not customers.data:
-            return {
-                "has_subscription": False,
-                "plan": "free",
-                "status": "no_customer",
-            }
+            status = build_free_status("no_customer")
+            subscription_store.set(email, None, status)
+            return status
 
         customer = customers.data[0]
 
         # Get active subscriptions for this customer
-        subscriptions = stripe.Subscription.list(
+        subscriptions = await stripe.Subscription.list_async(
             customer=customer.id,
             status="active",
             limit=1,
         )
 
         if not subscriptions.data:
-            return {
-                "has_subscription": False,
-                "plan": "free",
-                "status": "no_active_subscription",
-            }
+            status = build_free_status("no_active_subscription")
+            subscription_store.set(email, customer.id, status)
+            return status
 
         subscription = subscriptions.data[0]
-        price_id = subscription["items"]["data"][0]["price"]["id"]
-
-        # Determine plan name from price ID
-        plan = "unknown"
-        for plan_name, pid in PRICE_IDS.items():
-            if pid == price_id:
-                plan = plan_name
-                break
-
-        return {
-            "has_subscription": True,
-            "plan": plan,
-            "status": subscription["status"],
-            "current_period_end": subscription["current_period_end"],
-            "cancel_at_period_end": subscription["cancel_at_period_end"],
-        }
+        status = build_subscription_status(subscription)
+        subscription_store.set(email, customer.id, status, subscription_id=subscription["id"])
+        return status
 
     except stripe.error.StripeError as e:
         logger.error(f"Stripe error checking subscription: {e}")
@@ -209,21 +576,19 @@ async def get_subscription_status(email: str):
 async def get_checkout_session(session_id: str):
     """
     Retrieve checkout session details (used by success page to show confirmation).
+    Completed sessions are usually already cached from the checkout.session.completed webhook.
     """
+    cached = checkout_session_cache.get(session_id)
+    if cached:
+        return cached
+
     try:
-        session = stripe.checkout.Session.retrieve(
-            session_id,
-            expand=["subscription", "customer"],
-        )
-        return {
-            "customer_email": session.get("customer_email")
-                or session.get("customer_details", {}).get("email"),
-            "payment_status": session.get("payment_status"),
-            "subscription_id": session.get("subscription", {}).get("id")
-                if isinstance(session.get("subscription"), dict) else session.get("subscription"),
-            "amount_total": session.get("amount_total"),
-            "currency": session.get("currency"),
-        }
+        # Only IDs are projected, so the subscription/customer don't need expanding
+        session = await stripe.checkout.Session.retrieve_async(session_id)
+        result = build_checkout_session_response(session)
+        if result["payment_status"] in ("paid", "no_payment_required"):
+            checkout_session_cache.set(session_id, result)
+        return result
     except stripe.error.StripeError as e:
         logger.error(f"Error retrieving session: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,187 @@
+"""
+Prompt token budget analyzer for Sara AI Assistant
+Reports token counts per prompt section and checks them against prompt_budget.json
+
+Usage:
+    python prompt_budget.py            # print the report
+    python prompt_budget.py --check    # fail if a prompt grew past its recorded budget
+    python prompt_budget.py --update   # record the current counts as the budget
+
+Add --tokenizer estimate to use the offline approximation even when tiktoken is
+installed (CI does this so the check is reproducible).
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+
+from prompts import (
+    AGENT_INSTRUCTION,
+    SESSION_INSTRUCTION,
+    COMPACT_AGENT_INSTRUCTION,
+    COMPACT_SESSION_INSTRUCTION,
+)
+
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompt_budget.json")
+
+# Encoding used by the gpt-4.1 family
+TIKTOKEN_ENCODING = "o200k_base"
+
+PROMPTS = {
+    "agent_instruction": AGENT_INSTRUCTION,
+    "session_instruction": SESSION_INSTRUCTION,
+    "compact_agent_instruction": COMPACT_AGENT_INSTRUCTION,
+    "compact_session_instruction": COMPACT_SESSION_INSTRUCTION,
+}
+
+# Top-level prompt sections grouped for the report
+SECTION_GROUPS = {
+    "Persona": "persona",
+    "Context": "persona",
+    "Task": "persona",
+    "Specifics": "persona",
+    "Behavior Guidelines": "persona",
+    "Navigation & Website Management": "routes",
+    "Session Objective": "session flow",
+    "Session Flow": "session flow",
+    "Session Safety & Privacy": "safety",
+    "Output Format Rules": "output format",
+}
+
+_ESTIMATE_PATTERN = re.compile(r"[^\W\d_]+|\d+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Deterministic approximation of BPE token counts (one token per ~5 letters of
+    a word, per digit run and per punctuation mark). Used when tiktoken or its
+    encoding data is unavailable, so budgets can be checked offline.
+    """
+    return sum(
+        max(1, math.ceil(len(piece) / 5)) if piece[0].isalpha() else 1
+        for piece in _ESTIMATE_PATTERN.findall(text)
+    )
+
+
+def get_tokenizer(preferred: str = "auto"):
+    """Return (name, count function), preferring the exact tiktoken encoding"""
+    if preferred == "estimate":
+        return "estimate", estimate_tokens
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding(TIKTOKEN_ENCODING)
+        return TIKTOKEN_ENCODING, lambda text: len(encoding.encode(text))
+    except Exception:
+        return "estimate", estimate_tokens
+
+
+def split_sections(prompt: str) -> list:
+    """Split a prompt into (top-level heading, text) pairs"""
+    sections = []
+    heading, lines = "(preamble)", []
+    for line in prompt.split("\n"):
+        if line.startswith("# "):
+            if "".join(lines).strip():
+                sections.append((heading, "\n".join(lines)))
+            heading, lines = line[2:].strip(), []
+        lines.append(line)
+    if "".join(lines).strip():
+        sections.append((heading, "\n".join(lines)))
+    return sections
+
+
+def analyze(count_tokens) -> dict:
+    """Token counts per prompt: total, per section and per section group"""
+    report = {}
+    for prompt_name, prompt in PROMPTS.items():
+        sections = {}
+        groups = {}
+        for heading, text in split_sections(prompt):
+            tokens = count_tokens(text)
+            sections[heading] = tokens
+            group = SECTION_GROUPS.get(heading, "other")
+            groups[group] = groups.get(group, 0) + tokens
+        report[prompt_name] = {
+            "total": count_tokens(prompt),
+            "sections": sections,
+            "groups": groups,
+        }
+    return report
+
+
+def print_report(tokenizer_name: str, report: dict):
+    print(f"Prompt token counts ({tokenizer_name})\n")
+    for prompt_name, counts in report.items():
+        print(f"{prompt_name}: {counts['total']} tokens")
+        for group, tokens in counts["groups"].items():
+            print(f"  [{group}] {tokens}")
+        for heading, tokens in counts["sections"].items():
+            print(f"    {heading}: {tokens}")
+        print()
+
+
+def load_budget() -> dict:
+    if not os.path.exists(BUDGET_PATH):
+        return {}
+    with open(BUDGET_PATH, encoding="utf-8") as budget_file:
+        return json.load(budget_file)
+
+
+def check_budget(tokenizer_name: str, report: dict) -> bool:
+    """Compare prompt totals with the recorded budget for this tokenizer"""
+    budget = load_budget().get(tokenizer_name)
+    if not budget:
+        print(f"No budget recorded for tokenizer '{tokenizer_name}'; run with --update to record one.")
+        return True
+
+    ok = True
+    for prompt_name, counts in report.items():
+        limit = budget.get(prompt_name)
+        if limit is None:
+            print(f"MISSING  {prompt_name}: {counts['total']} tokens (no budget recorded)")
+            ok = False
+        elif counts["total"] > limit:
+            print(f"OVER     {prompt_name}: {counts['total']} tokens (budget {limit})")
+            ok = False
+        else:
+            print(f"OK       {prompt_name}: {counts['total']} tokens (budget {limit})")
+    return ok
+
+
+def update_budget(tokenizer_name: str, report: dict):
+    budget = load_budget()
+    budget[tokenizer_name] = {
+        prompt_name: counts["total"] for prompt_name, counts in report.items()
+    }
+    with open(BUDGET_PATH, "w", encoding="utf-8") as budget_file:
+        json.dump(budget, budget_file, indent=4, sort_keys=True)
+        budget_file.write("\n")
+    print(f"Recorded {tokenizer_name} budget in {BUDGET_PATH}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Report and check prompt token budgets")
+    parser.add_argument("--check", action="store_true", help="fail if a prompt exceeds its budget")
+    parser.add_argument("--update", action="store_true", help="record current counts as the budget")
+    parser.add_argument("--tokenizer", choices=["auto", "estimate"], default="auto",
+                        help="'auto' uses tiktoken when available, 'estimate' always approximates")
+    args = parser.parse_args()
+
+    tokenizer_name, count_tokens = get_tokenizer(args.tokenizer)
+    report = analyze(count_tokens)
+
+    if args.update:
+        update_budget(tokenizer_name, report)
+        return 0
+    if args.check:
+        return 0 if check_budget(tokenizer_name, report) else 1
+
+    print_report(tokenizer_name, report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,23 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from livekit import api
 import os
 from dotenv import load_dotenv
 import logging
 from payment import router as payment_router
+from transcript_cache import TranscriptCache
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound, VideoUnavailable
 import re
+import json
+from typing import Literal
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv()
 
@@ -57,41 +66,126 @@ app.include_router(payment_router)
 def read_root():
     return {"message": "SYNAPZ AI Voice Agent Server", "status": "running"}
 
+# LiveKit credentials are read once at startup
+LIVEKIT_URL = os.environ.get("LIVEKIT_URL")
+LIVEKIT_API_KEY = os.environ.get("LIVEKIT_API_KEY")
+LIVEKIT_API_SECRET = os.environ.get("LIVEKIT_API_SECRET")
+LIVEKIT_ROOM_PREFIX = os.environ.get("LIVEKIT_ROOM_PREFIX", "synapz-voice-agent")
+
+# When set, rooms explicitly dispatch this named agent (must match the agent
+# worker's LIVEKIT_AGENT_NAME) with the session's language and mode as metadata
+LIVEKIT_AGENT_NAME = os.environ.get("LIVEKIT_AGENT_NAME", "")
+
+# Issued tokens are reused per (user, room, dispatch metadata) until they are close to expiry
+LIVEKIT_TOKEN_TTL = int(os.environ.get("LIVEKIT_TOKEN_TTL", "900"))
+LIVEKIT_TOKEN_REFRESH_MARGIN = int(os.environ.get("LIVEKIT_TOKEN_REFRESH_MARGIN", "120"))
+LIVEKIT_TOKEN_CACHE_SIZE = 1024
+livekit_token_cache: OrderedDict[tuple[str, str, str], tuple[str, float]] = OrderedDict()
+
+# User and session IDs are used verbatim in room names, so IDs that would need
+# rewriting (and could then collide with another user's) are rejected
+ROOM_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+def get_room_name(user_id: str, session_id: str | None = None) -> str:
+    """
+    Build a dedicated room name for a learner session (or the user, if no
+    session is given) so agent jobs are spread across workers. The user ID is
+    always part of the name, so a session ID can't open another user's room.
+
+    Raises:
+        HTTPException: 400 if an ID is empty, too long or has characters other
+            than letters, digits, '_' and '-'
+    """
+    session_id = session_id or None
+    for value in (user_id, session_id):
+        if value is not None and not ROOM_ID_PATTERN.fullmatch(value):
+            raise HTTPException(status_code=400, detail="Invalid user_id or session_id")
+    # '.' can't appear in either ID, so different (user, session) pairs never share a room
+    if session_id:
+        return f"{LIVEKIT_ROOM_PREFIX}-{user_id}.{session_id}"
+    return f"{LIVEKIT_ROOM_PREFIX}-{user_id}"
+
+def get_agent_dispatch_metadata(
+    user_id: str,
+    language: str | None = None,
+    mode: str | None = None,
+    prompt_mode: str | None = None,
+) -> str:
+    """Serialize the session options passed to the dispatched agent job"""
+    metadata = {"user_id": user_id}
+    if language:
+        metadata["language"] = language
+    if mode:
+        metadata["mode"] = mode
+    if prompt_mode:
+        metadata["prompt_mode"] = prompt_mode
+    return json.dumps(metadata, sort_keys=True)
+
+def mint_livekit_token(user_id: str, room_name: str, dispatch_metadata: str = "") -> str:
+    """Return a cached access token for the user and room, signing a new one if needed"""
+    key = (user_id, room_name, dispatch_metadata)
+    now = time.time()
+    cached = livekit_token_cache.get(key)
+    if cached and cached[1] - LIVEKIT_TOKEN_REFRESH_MARGIN > now:
+        return cached[0]
+    
+    # Generate token with permissions
+    token = api.AccessToken(LIVEKIT_API_KEY, LIVEKIT_API_SECRET)
+    token.with_identity(user_id)
+    token.with_name(f"User {user_id}")
+    token.with_ttl(timedelta(seconds=LIVEKIT_TOKEN_TTL))
+    token.with_grants(api.VideoGrants(
+        room_join=True,
+        room=room_name,
+        can_publish=True,
+        can_subscribe=True,
+    ))
+    if LIVEKIT_AGENT_NAME:
+        # Dispatch a dedicated agent job for the room when it is created
+        token.with_room_config(api.RoomConfiguration(
+            agents=[api.RoomAgentDispatch(
+                agent_name=LIVEKIT_AGENT_NAME,
+                metadata=dispatch_metadata,
+            )],
+        ))
+    jwt_token = token.to_jwt()
+    
+    livekit_token_cache[key] = (jwt_token, now + LIVEKIT_TOKEN_TTL)
+    livekit_token_cache.move_to_end(key)
+    while len(livekit_token_cache) > LIVEKIT_TOKEN_CACHE_SIZE:
+        livekit_token_cache.popitem(last=False)
+    return jwt_token
+
 @app.post("/api/token")
-async def get_token(user_id: str = "user"):
+async def get_token(
+    user_id: str = "user",
+    session_id: str | None = None,
+    language: Literal["en", "bn"] | None = None,
+    mode: Literal["lesson", "quiz", "read-along", "career-coach"] | None = None,
+    prompt_mode: Literal["full", "compact"] | None = None,
+):
     """
-    Generate a LiveKit access token for the user to join the voice agent room
+    Generate a LiveKit access token for the user to join their own voice agent room.
+    The optional language, mode and prompt_mode are forwarded to the agent job as
+    dispatch metadata.
     """
     try:
-        livekit_url = os.environ.get("LIVEKIT_URL")
-        api_key = os.environ.get("LIVEKIT_API_KEY")
-        api_secret = os.environ.get("LIVEKIT_API_SECRET")
-        
-        if not all([livekit_url, api_key, api_secret]):
+        if not all([LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET]):
             raise HTTPException(status_code=500, detail="LiveKit credentials not configured")
         
-        # Create a unique room name or use a shared room
-        room_name = "synapz-voice-agent"
-        
-        # Generate token with permissions
-        token = api.AccessToken(api_key, api_secret)
-        token.with_identity(user_id)
-        token.with_name(f"User {user_id}")
-        token.with_grants(api.VideoGrants(
-            room_join=True,
-            room=room_name,
-            can_publish=True,
-            can_subscribe=True,
-        ))
-        
-        jwt_token = token.to_jwt()
+        # One room per learner session so each gets its own agent job
+        room_name = get_room_name(user_id, session_id)
+        dispatch_metadata = get_agent_dispatch_metadata(user_id, language, mode, prompt_mode)
+        jwt_token = mint_livekit_token(user_id, room_name, dispatch_metadata)
         
         return {
             "token": jwt_token,
-            "url": livekit_url,
+            "url": LIVEKIT_URL,
             "room": room_name
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating token: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -103,90 +197,303 @@ def health_check():
 class YouTubeTranscriptRequest(BaseModel):
     video_url: str
 
+class YouTubeTranscriptBatchRequest(BaseModel):
+    video_urls: list[str]
+
+# Matches watch?v=, youtu.be, embed, shorts, live and /v/ URLs (www., m. or bare host)
+# in one pass and only accepts a well-formed 11-character video ID
+YOUTUBE_URL_PATTERN = re.compile(
+    r'(?:^|[/.])(?:youtube\.com/(?:watch\?(?:[^#\s]*&)?v=|embed/|shorts/|live/|v/)|youtu\.be/)'
+    r'([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])'
+)
+
 def extract_video_id(url: str) -> str:
     """Extract video ID from various YouTube URL formats"""
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/)([^&\n?#]+)',
-        r'youtube\.com\/embed\/([^&\n?#]+)',
-        r'youtube\.com\/v\/([^&\n?#]+)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
+    match = YOUTUBE_URL_PATTERN.search(url.strip())
+    if match:
+        return match.group(1)
     
     raise ValueError("Invalid YouTube URL")
 
+# Preferred transcript language; also the language part of the cache key
+TRANSCRIPT_LANGUAGE = "en"
+
+transcript_cache = TranscriptCache()
+
+# youtube-transcript-api is a blocking client, so fetches run in a bounded
+# thread pool instead of on the event loop
+TRANSCRIPT_FETCH_CONCURRENCY = int(os.environ.get("TRANSCRIPT_FETCH_CONCURRENCY", "8"))
+TRANSCRIPT_FETCH_TIMEOUT = float(os.environ.get("TRANSCRIPT_FETCH_TIMEOUT", "20"))
+transcript_executor = ThreadPoolExecutor(
+    max_workers=TRANSCRIPT_FETCH_CONCURRENCY,
+    thread_name_prefix="transcript-fetch",
+)
+
+# In-progress fetches by video ID, so concurrent requests for the same video
+# share one upstream fetch (and its result or error)
+transcript_inflight: dict[str, asyncio.Future] = {}
+transcript_fetch_stats = {"fetches": 0, "coalesced_requests": 0}
+
+# Batch ingestion limits (per request). Batch fetches run in their own thread
+# pool so a large batch can't occupy every worker and make interactive
+# requests time out waiting in the queue.
+TRANSCRIPT_BATCH_MAX_ITEMS = int(os.environ.get("TRANSCRIPT_BATCH_MAX_ITEMS", "200"))
+TRANSCRIPT_BATCH_CONCURRENCY = int(os.environ.get("TRANSCRIPT_BATCH_CONCURRENCY", "8"))
+transcript_batch_executor = ThreadPoolExecutor(
+    max_workers=TRANSCRIPT_BATCH_CONCURRENCY,
+    thread_name_prefix="transcript-batch",
+)
+
+def fetch_transcript(video_id: str) -> dict:
+    """
+    Fetch a transcript from YouTube and normalize it into timed segments,
+    stored as (text, start, duration) tuples to keep cached transcripts small.
+    Failures that will not change on retry are stored in the cache as negative entries.
+    """
+    try:
+        # Try to get English transcript first
+        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+        
+        # Try to find English transcript
+        try:
+            transcript = transcript_list.find_transcript([TRANSCRIPT_LANGUAGE])
+        except NoTranscriptFound:
+            # If no English transcript, get the first available one
+            available_transcripts = list(transcript_list)
+            if not available_transcripts:
+                detail = "No transcripts available for this video"
+                transcript_cache.set_error(video_id, TRANSCRIPT_LANGUAGE, 404, detail)
+                raise HTTPException(status_code=404, detail=detail)
+            transcript = available_transcripts[0]
+        
+        # Fetch the actual transcript data
+        transcript_data = transcript.fetch()
+        
+        # Clean up each segment once (remove extra whitespace, newlines), keeping timestamps
+        segments = []
+        for entry in transcript_data:
+            text = ' '.join(entry['text'].split())
+            if text:
+                segments.append((text, entry['start'], entry['duration']))
+        
+        result = {
+            "video_id": video_id,
+            "language": transcript.language,
+            "language_code": transcript.language_code,
+            "segments": segments,
+        }
+        transcript_cache.set_result(video_id, TRANSCRIPT_LANGUAGE, result)
+        return result
+        
+    except TranscriptsDisabled:
+        detail = "Transcripts are disabled for this video"
+        transcript_cache.set_error(video_id, TRANSCRIPT_LANGUAGE, 403, detail)
+        raise HTTPException(status_code=403, detail=detail)
+    except VideoUnavailable:
+        raise HTTPException(
+            status_code=404,
+            detail="Video not found or unavailable"
+        )
+    except NoTranscriptFound:
+        detail = "No transcripts found for this video"
+        transcript_cache.set_error(video_id, TRANSCRIPT_LANGUAGE, 404, detail)
+        raise HTTPException(status_code=404, detail=detail)
+
+async def load_transcript(video_id: str, executor: ThreadPoolExecutor = transcript_executor) -> dict:
+    """
+    Fetch transcript segments in a worker pool, joining an in-progress fetch
+    for the same video if there is one
+
+    Args:
+        video_id: YouTube video ID
+        executor: Thread pool for a new fetch (the batch pool for batch requests)
+    """
+    future = transcript_inflight.get(video_id)
+    if future:
+        transcript_fetch_stats["coalesced_requests"] += 1
+    else:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(executor, fetch_transcript, video_id)
+        transcript_inflight[video_id] = future
+        transcript_fetch_stats["fetches"] += 1
+
+        def _on_done(done: asyncio.Future):
+            if transcript_inflight.get(video_id) is done:
+                del transcript_inflight[video_id]
+            # Mark the error as retrieved in case every waiter timed out
+            if not done.cancelled():
+                done.exception()
+
+        future.add_done_callback(_on_done)
+
+    # Shield the shared fetch so one caller's timeout does not cancel it for the others
+    try:
+        return await asyncio.wait_for(
+            asyncio.shield(future),
+            timeout=TRANSCRIPT_FETCH_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        logger.warning(f"Timed out fetching transcript for {video_id}")
+        raise HTTPException(
+            status_code=504,
+            detail="Timed out fetching transcript from YouTube"
+        )
+
+async def get_transcript(video_id: str, executor: ThreadPoolExecutor = transcript_executor) -> dict:
+    """
+    Return transcript segments from the cache (including known failures),
+    falling back to a coalesced fetch in the given thread pool
+    """
+    cached = transcript_cache.get_from_memory(video_id, TRANSCRIPT_LANGUAGE)
+    if not cached:
+        # get() falls back to the SQLite tier, which blocks, so it runs off the event loop
+        loop = asyncio.get_running_loop()
+        cached = await loop.run_in_executor(None, transcript_cache.get, video_id, TRANSCRIPT_LANGUAGE)
+    if cached:
+        if "error" in cached:
+            raise HTTPException(**cached["error"])
+        return cached["result"]
+    
+    return await load_transcript(video_id, executor)
+
+def window_segments(segments: list, start: float | None, end: float | None) -> list:
+    """Return the segments that overlap the [start, end) window in seconds"""
+    if start is None and end is None:
+        return segments
+    return [
+        segment for segment in segments
+        if (start is None or segment[1] + segment[2] > start)
+        and (end is None or segment[1] < end)
+    ]
+
+def build_transcript_response(transcript: dict, segments: list) -> dict:
+    """Join segment text into the plain JSON transcript response"""
+    return {
+        "success": True,
+        "video_id": transcript["video_id"],
+        "transcript": ' '.join(text for text, _, _ in segments),
+        "language": transcript["language"],
+        "language_code": transcript["language_code"]
+    }
+
+def iter_transcript_ndjson(transcript: dict, segments: list):
+    """Yield a header line followed by one NDJSON line per segment"""
+    yield json.dumps({
+        "video_id": transcript["video_id"],
+        "language": transcript["language"],
+        "language_code": transcript["language_code"],
+    }) + "\n"
+    for text, start, duration in segments:
+        yield json.dumps({"text": text, "start": start, "duration": duration}) + "\n"
+
 @app.post("/api/youtube/transcript")
-async def get_youtube_transcript(request: YouTubeTranscriptRequest):
+async def get_youtube_transcript(
+    request: YouTubeTranscriptRequest,
+    stream: bool = False,
+    start: float | None = None,
+    end: float | None = None,
+):
     """
     Fetch transcript/captions from a YouTube video using youtube-transcript-api
+
+    Query parameters:
+        stream: Stream NDJSON segments (text, start, duration) instead of one JSON body
+        start: Only include segments that end after this many seconds
+        end: Only include segments that begin before this many seconds
     """
     try:
+        if start is not None and end is not None and end <= start:
+            raise HTTPException(status_code=400, detail="'end' must be greater than 'start'")
+        
         # Extract video ID from URL
         try:
             video_id = extract_video_id(request.video_url)
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
         
-        # Get transcript using youtube-transcript-api
-        try:
-            # Try to get English transcript first
-            transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-            
-            # Try to find English transcript
-            try:
-                transcript = transcript_list.find_transcript(['en'])
-            except NoTranscriptFound:
-                # If no English transcript, get the first available one
-                available_transcripts = list(transcript_list)
-                if not available_transcripts:
-                    raise HTTPException(
-                        status_code=404,
-                        detail="No transcripts available for this video"
-                    )
-                transcript = available_transcripts[0]
-            
-            # Fetch the actual transcript data
-            transcript_data = transcript.fetch()
-            
-            # Combine all text segments into one string
-            full_text = ' '.join([entry['text'] for entry in transcript_data])
-            
-            # Clean up the text (remove extra whitespace, newlines)
-            full_text = ' '.join(full_text.split())
-            
-            return {
-                "success": True,
-                "video_id": video_id,
-                "transcript": full_text,
-                "language": transcript.language,
-                "language_code": transcript.language_code
-            }
-            
-        except TranscriptsDisabled:
-            raise HTTPException(
-                status_code=403,
-                detail="Transcripts are disabled for this video"
-            )
-        except VideoUnavailable:
-            raise HTTPException(
-                status_code=404,
-                detail="Video not found or unavailable"
-            )
-        except NoTranscriptFound:
-            raise HTTPException(
-                status_code=404,
-                detail="No transcripts found for this video"
+        # Get transcript using youtube-transcript-api without blocking the event loop
+        transcript = await get_transcript(video_id)
+        segments = window_segments(transcript["segments"], start, end)
+        
+        if stream:
+            return StreamingResponse(
+                iter_transcript_ndjson(transcript, segments),
+                media_type="application/x-ndjson",
             )
         
+        return build_transcript_response(transcript, segments)
+        
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error fetching YouTube transcript: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def load_batch_item(index: int, video_url: str, semaphore: asyncio.Semaphore) -> dict:
+    """Fetch one batch entry, reporting failures as a result instead of raising"""
+    async with semaphore:
+        try:
+            video_id = extract_video_id(video_url)
+            transcript = await get_transcript(video_id, transcript_batch_executor)
+            result = build_transcript_response(transcript, transcript["segments"])
+        except ValueError as e:
+            result = {"success": False, "status_code": 400, "error": str(e)}
+        except HTTPException as e:
+            result = {"success": False, "status_code": e.status_code, "error": e.detail}
+        except Exception as e:
+            logger.error(f"Error fetching YouTube transcript for {video_url}: {e}")
+            result = {"success": False, "status_code": 500, "error": str(e)}
+    return {"index": index, "video_url": video_url, **result}
+
+@app.post("/api/youtube/transcripts:batch")
+async def get_youtube_transcripts_batch(request: YouTubeTranscriptBatchRequest):
+    """
+    Fetch transcripts for many YouTube videos concurrently (e.g. a whole course).
+    Streams one NDJSON result per video, in completion order, each tagged with
+    its index in the request.
+    """
+    if not request.video_urls:
+        raise HTTPException(status_code=400, detail="No video URLs provided")
+    if len(request.video_urls) > TRANSCRIPT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many video URLs (max {TRANSCRIPT_BATCH_MAX_ITEMS})"
+        )
+
+    async def iter_results():
+        semaphore = asyncio.Semaphore(TRANSCRIPT_BATCH_CONCURRENCY)
+        tasks = [
+            asyncio.create_task(load_batch_item(index, video_url, semaphore))
+            for index, video_url in enumerate(request.video_urls)
+        ]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield json.dumps(await next_result) + "\n"
+        finally:
+            # Stop outstanding fetches if the client disconnects
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(iter_results(), media_type="application/x-ndjson")
+
+@app.get("/api/youtube/transcript/stats")
+def get_transcript_stats():
+    """
+    Return transcript cache hit/miss and fetch coalescing statistics
+    """
+    return {
+        "cache": transcript_cache.get_stats(),
+        "fetch": {
+            **transcript_fetch_stats,
+            "in_flight": len(transcript_inflight),
+        },
+    }
+
+@app.on_event("shutdown")
+def shutdown_transcript_executor():
+    transcript_executor.shutdown(wait=False, cancel_futures=True)
+    transcript_batch_executor.shutdown(wait=False, cancel_futures=True)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,130 @@
+"""
+Agent Startup Graph for Sara AI Assistant
+Runs independent startup steps concurrently and records a timeline span per step
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class StartupStep:
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[dict], Awaitable[Any]],
+        depends_on: tuple = (),
+        timeout: float | None = None,
+        fallback: Callable[[dict], Any] | None = None,
+    ):
+        self.name = name
+        self.run = run
+        self.depends_on = depends_on
+        self.timeout = timeout
+        self.fallback = fallback
+
+
+class StartupGraph:
+    """
+    Dependency graph of async startup steps.
+
+    Each step starts as soon as the steps it depends on have finished and
+    receives their results as a dict. A step that fails or exceeds its timeout
+    uses its fallback if it has one; otherwise the remaining steps are cancelled
+    and the error is raised.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.steps: dict[str, StartupStep] = {}
+        self.results: dict[str, Any] = {}
+        self.timeline: list[dict] = []
+        self._started = 0.0
+
+    def add_step(
+        self,
+        name: str,
+        run: Callable[[dict], Awaitable[Any]],
+        depends_on: tuple = (),
+        timeout: float | None = None,
+        fallback: Callable[[dict], Any] | None = None,
+    ):
+        """
+        Args:
+            name: Unique step name, used in the timeline
+            run: Async function called with the results of its dependencies
+            depends_on: Names of steps that must finish first
+            timeout: Seconds before the step is cancelled, or None for no limit
+            fallback: Called with the dependency results when the step fails or
+                      times out; its return value becomes the step result
+        """
+        for dependency in depends_on:
+            if dependency not in self.steps:
+                raise ValueError(f"Startup step '{name}' depends on unknown step '{dependency}'")
+        self.steps[name] = StartupStep(name, run, depends_on, timeout, fallback)
+
+    async def run(self) -> dict[str, Any]:
+        """Run all steps and return their results keyed by step name"""
+        self._started = time.perf_counter()
+        tasks: dict[str, asyncio.Task] = {}
+        for step in self.steps.values():
+            tasks[step.name] = asyncio.create_task(
+                self._run_step(step, [tasks[dependency] for dependency in step.depends_on]),
+                name=f"{self.name}:{step.name}",
+            )
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        finally:
+            self._log_timeline()
+        return self.results
+
+    async def _run_step(self, step: StartupStep, dependencies: list[asyncio.Task]):
+        await asyncio.gather(*dependencies)
+        inputs = {name: self.results[name] for name in step.depends_on}
+
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            self.results[step.name] = await asyncio.wait_for(step.run(inputs), step.timeout)
+        except Exception as e:
+            timed_out = isinstance(e, asyncio.TimeoutError)
+            status = "timeout" if timed_out else "error"
+            detail = f"timed out after {step.timeout}s" if timed_out else str(e)
+            if not step.fallback:
+                self._record_span(step.name, start, status)
+                logger.error(f"Startup step '{step.name}' failed: {detail}")
+                raise
+            logger.warning(f"Startup step '{step.name}' failed, using fallback: {detail}")
+            self.results[step.name] = step.fallback(inputs)
+            status = f"{status}, fallback"
+        except asyncio.CancelledError:
+            self._record_span(step.name, start, "cancelled")
+            raise
+        self._record_span(step.name, start, status)
+
+    def _record_span(self, name: str, start: float, status: str):
+        end = time.perf_counter()
+        self.timeline.append({
+            "step": name,
+            "start_ms": round((start - self._started) * 1000),
+            "end_ms": round((end - self._started) * 1000),
+            "duration_ms": round((end - start) * 1000),
+            "status": status,
+        })
+
+    def _log_timeline(self):
+        total_ms = round((time.perf_counter() - self._started) * 1000)
+        spans = ", ".join(
+            f"{span['step']} {span['start_ms']}-{span['end_ms']} ms ({span['status']})"
+            for span in sorted(self.timeline, key=lambda span: span["start_ms"])
+        )
+        logger.info(f"{self.name} timeline ({total_ms} ms total): {spans}")
@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+
+# Modules live at the top of ai-avatar/, next to this tests directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("LIVEKIT_URL", "test")
+os.environ.setdefault("LIVEKIT_API_KEY", "test")
+os.environ.setdefault("LIVEKIT_API_SECRET", "test")
+
+# Keep the SQLite caches and ledgers the modules open at import out of the tree
+_cache_dir = tempfile.mkdtemp(prefix="synapz-tests-")
+os.environ.setdefault("TRANSCRIPT_CACHE_PATH", os.path.join(_cache_dir, "transcript_cache.sqlite3"))
+os.environ.setdefault("STRIPE_EVENT_LEDGER_PATH", os.path.join(_cache_dir, "stripe_events.sqlite3"))
+os.environ.setdefault("MCP_TOOL_CACHE_PATH", os.path.join(_cache_dir, "mcp_tool_cache.sqlite3"))
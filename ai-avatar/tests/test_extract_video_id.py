@@ -0,0 +1,48 @@
+import pytest
+
+import server
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+VALID_URLS = [
+    f"https://www.youtube.com/watch?v={VIDEO_ID}",
+    f"https://youtube.com/watch?v={VIDEO_ID}",
+    f"https://m.youtube.com/watch?v={VIDEO_ID}",
+    f"http://www.youtube.com/watch?v={VIDEO_ID}",
+    f"www.youtube.com/watch?v={VIDEO_ID}",
+    f"https://www.youtube.com/watch?v={VIDEO_ID}&t=42s",
+    f"https://www.youtube.com/watch?feature=share&v={VIDEO_ID}",
+    f"https://www.youtube.com/watch?v={VIDEO_ID}#comments",
+    f"https://youtu.be/{VIDEO_ID}",
+    f"https://youtu.be/{VIDEO_ID}?si=abc123",
+    f"https://www.youtube.com/embed/{VIDEO_ID}",
+    f"https://www.youtube.com/shorts/{VIDEO_ID}",
+    f"https://www.youtube.com/live/{VIDEO_ID}?feature=share",
+    f"https://www.youtube.com/v/{VIDEO_ID}",
+    f"  https://youtu.be/{VIDEO_ID}  ",
+]
+
+INVALID_URLS = [
+    "",
+    "not a url",
+    "https://www.youtube.com/",
+    "https://www.youtube.com/watch?v=short",
+    f"https://www.youtube.com/watch?v={VIDEO_ID}x",
+    "https://www.youtube.com/watch?v=dQw4w9WgXc!",
+    f"https://www.youtube.com/watch?list={VIDEO_ID}",
+    "https://youtu.be/",
+    f"https://notyoutube.com/watch?v={VIDEO_ID}",
+    f"https://vimeo.com/{VIDEO_ID}",
+    f"https://www.youtube.com/channel/{VIDEO_ID}",
+]
+
+
+@pytest.mark.parametrize("url", VALID_URLS)
+def test_extracts_video_id(url):
+    assert server.extract_video_id(url) == VIDEO_ID
+
+
+@pytest.mark.parametrize("url", INVALID_URLS)
+def test_rejects_invalid_urls(url):
+    with pytest.raises(ValueError):
+        server.extract_video_id(url)
@@ -0,0 +1,28 @@
+import pytest
+
+import tools
+
+# Misspelled, transliterated and Bangla page names -> expected route path
+FUZZY_ROUTES = [
+    ("dashbord", "/dashboard"),
+    ("kuiz", "/quiz"),
+    ("setings", "/settings"),
+    ("porikkha", "/quiz"),
+    ("chakri", "/jobs"),
+    ("কুইজ", "/quiz"),
+    ("লেসনে", "/lessons"),
+    ("অগ্রগতি", "/progress"),
+    ("আমার ড্যাশবোর্ড", "/dashboard"),
+]
+
+
+@pytest.mark.parametrize("query, path", FUZZY_ROUTES)
+def test_fuzzy_and_bangla_matches(query, path):
+    route = tools.find_route_by_keyword(query)
+    assert route is not None
+    assert route["path"] == path
+
+
+def test_edit_distance_stops_past_limit():
+    assert tools._edit_distance("quiz", "kuiz", 2) == 1
+    assert tools._edit_distance("dashboard", "settings", 2) == 3
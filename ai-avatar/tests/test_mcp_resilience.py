@@ -0,0 +1,125 @@
+import asyncio
+
+import anyio
+import pytest
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+from mcp.types import INVALID_PARAMS, ErrorData
+
+from mcp_client.resilience import (
+    CircuitBreaker,
+    ToolDeadlineError,
+    call_with_retry,
+    is_transport_error,
+)
+
+
+async def call_over_dropped_stream():
+    """Call a tool on a session whose server drops the stream once the request arrives"""
+    client_send, server_receive = anyio.create_memory_object_stream(10)
+    server_send, client_receive = anyio.create_memory_object_stream(10)
+    async with ClientSession(client_receive, client_send) as session:
+        call = asyncio.ensure_future(session.call_tool("lookup", {}))
+        await server_receive.receive()
+        await server_send.aclose()
+        try:
+            return await call
+        except McpError as e:
+            error = e
+    # Raised after the session closes, as for MCPServerSse whose session
+    # outlives the call, so the session's task group doesn't wrap it
+    raise error
+
+
+def run_with_retry(call, breaker, idempotent=True, attempt_timeout=5, deadline=None):
+    failures = []
+
+    async def on_failure(error):
+        failures.append(error)
+
+    async def main():
+        try:
+            return await call_with_retry(
+                call, breaker, idempotent=idempotent, description="lookup",
+                on_failure=on_failure, attempt_timeout=attempt_timeout, deadline=deadline,
+            )
+        finally:
+            # Let on_failure callbacks left running in the background finish
+            await asyncio.sleep(0.01)
+
+    return asyncio.run(main()), failures
+
+
+def test_dropped_stream_is_retried(monkeypatch):
+    monkeypatch.setattr("mcp_client.resilience.backoff_delay", lambda attempt: 0)
+    attempts = []
+
+    async def call():
+        attempts.append(None)
+        if len(attempts) == 1:
+            return await call_over_dropped_stream()
+        return "ok"
+
+    breaker = CircuitBreaker("test")
+    result, failures = run_with_retry(call, breaker)
+    assert result == "ok"
+    assert len(attempts) == 2
+    assert len(failures) == 1 and is_transport_error(failures[0])
+    assert breaker.failures == 0
+
+
+def test_dropped_stream_counts_as_failure():
+    breaker = CircuitBreaker("test")
+    with pytest.raises(McpError) as excinfo:
+        run_with_retry(call_over_dropped_stream, breaker, idempotent=False)
+    assert is_transport_error(excinfo.value)
+    assert breaker.failures == 1
+
+
+def test_server_error_is_not_retried():
+    attempts = []
+
+    async def call():
+        attempts.append(None)
+        raise McpError(ErrorData(code=INVALID_PARAMS, message="bad arguments"))
+
+    breaker = CircuitBreaker("test")
+    breaker.failures = 2
+    with pytest.raises(McpError):
+        run_with_retry(call, breaker)
+    assert len(attempts) == 1
+    assert breaker.failures == 0
+
+
+async def slow_call():
+    await asyncio.sleep(1)
+
+
+def test_deadline_is_not_a_server_failure():
+    breaker = CircuitBreaker("test")
+    failures = []
+
+    async def on_failure(error):
+        failures.append(error)
+
+    async def main():
+        with pytest.raises(ToolDeadlineError):
+            await call_with_retry(
+                slow_call, breaker, idempotent=True, description="lookup",
+                on_failure=on_failure, deadline=0.05,
+            )
+        # on_failure runs in the background after the deadline
+        await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert breaker.failures == 0
+    assert len(failures) == 1
+
+
+def test_attempt_timeout_is_a_server_failure(monkeypatch):
+    monkeypatch.setattr("mcp_client.resilience.backoff_delay", lambda attempt: 0)
+    breaker = CircuitBreaker("test")
+    with pytest.raises(asyncio.TimeoutError) as excinfo:
+        run_with_retry(slow_call, breaker, idempotent=False, attempt_timeout=0.05, deadline=5)
+    assert not isinstance(excinfo.value, ToolDeadlineError)
+    assert breaker.failures == 1
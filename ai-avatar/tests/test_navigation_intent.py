@@ -0,0 +1,37 @@
+import pytest
+
+import tools
+
+NAVIGATION_COMMANDS = [
+    ("go to lessons", "/lessons"),
+    ("go to lesson", "/lessons"),
+    ("go to my lesson", "/lessons"),
+    ("take me to the lesson", "/lessons"),
+    ("take me to the quiz", "/quiz"),
+    ("go to the quiz page", "/quiz"),
+    ("open settings", "/settings"),
+    ("go to dashboard", "/dashboard"),
+]
+
+# Utterances that mention a page but are not a command to go there
+NOT_NAVIGATION = [
+    "take a quiz",
+    "show me a quiz question",
+    "what did i learn in the last lesson",
+    "lessons",
+    "switch language to bangla",
+    "switch to bangla language",
+    "go to the last quiz question",
+]
+
+
+@pytest.mark.parametrize("utterance, path", NAVIGATION_COMMANDS)
+def test_navigation_commands(utterance, path):
+    route = tools.detect_navigation_intent(utterance)
+    assert route is not None, utterance
+    assert route["path"] == path
+
+
+@pytest.mark.parametrize("utterance", NOT_NAVIGATION)
+def test_not_navigation(utterance):
+    assert tools.detect_navigation_intent(utterance) is None
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+import payment
+
+EMAIL = "learner@example.com"
+
+
+def subscription_event(event_type, status="active", subscription_id="sub_1"):
+    return {
+        "type": event_type,
+        "data": {"object": {
+            "id": subscription_id,
+            "customer": "cus_1",
+            "status": status,
+            "items": {"data": [{"price": {"id": "price_pro"}}]},
+            "current_period_end": 1900000000,
+            "cancel_at_period_end": False,
+        }},
+    }
+
+
+def checkout_completed_event(subscription_id="sub_1"):
+    return {
+        "type": "checkout.session.completed",
+        "data": {"object": {
+            "id": "cs_1",
+            "customer": "cus_1",
+            "customer_email": EMAIL,
+            "subscription": subscription_id,
+            "payment_status": "paid",
+        }},
+    }
+
+
+@pytest.fixture(autouse=True)
+def subscription_store(monkeypatch):
+    store = payment.SubscriptionStore()
+    monkeypatch.setattr(payment, "subscription_store", store)
+    monkeypatch.setattr(payment, "checkout_session_cache", payment.CheckoutSessionCache())
+    return store
+
+
+def apply(*events):
+    for event in events:
+        asyncio.run(payment.process_stripe_event(event))
+
+
+def test_subscription_created_before_checkout_completed(subscription_store):
+    apply(subscription_event("customer.subscription.created"), checkout_completed_event())
+    status = subscription_store.get(EMAIL)
+    assert status["has_subscription"] is True
+    assert status["status"] == "active"
+
+
+def test_checkout_completed_before_subscription_created(subscription_store):
+    apply(checkout_completed_event())
+    assert subscription_store.get(EMAIL) is None
+    apply(subscription_event("customer.subscription.created"))
+    assert subscription_store.get(EMAIL)["status"] == "active"
+
+
+def test_checkout_for_another_subscription_refreshes(subscription_store):
+    apply(
+        subscription_event("customer.subscription.deleted", status="canceled", subscription_id="sub_0"),
+        checkout_completed_event(subscription_id="sub_1"),
+    )
+    assert subscription_store.get(EMAIL) is None
@@ -0,0 +1,26 @@
+import prompt_budget
+
+
+def test_prompts_fit_budget():
+    report = prompt_budget.analyze(prompt_budget.estimate_tokens)
+    assert set(report) == {
+        "agent_instruction",
+        "session_instruction",
+        "compact_agent_instruction",
+        "compact_session_instruction",
+    }
+    assert prompt_budget.check_budget("estimate", report)
+
+
+def test_compact_prompts_are_smaller():
+    report = prompt_budget.analyze(prompt_budget.estimate_tokens)
+    for prompt_name in ("agent_instruction", "session_instruction"):
+        assert report[f"compact_{prompt_name}"]["total"] < report[prompt_name]["total"]
+
+
+def test_inflated_prompt_fails_budget(monkeypatch):
+    prompts = dict(prompt_budget.PROMPTS)
+    prompts["compact_agent_instruction"] += "\n# Extra\n" + "Repeat every answer twice. " * 50
+    monkeypatch.setattr(prompt_budget, "PROMPTS", prompts)
+    report = prompt_budget.analyze(prompt_budget.estimate_tokens)
+    assert not prompt_budget.check_budget("estimate", report)
@@ -0,0 +1,28 @@
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+def test_room_name_includes_user_and_session():
+    assert server.get_room_name("user-1", "abc") == f"{server.LIVEKIT_ROOM_PREFIX}-user-1.abc"
+    assert server.get_room_name("user-1") == f"{server.LIVEKIT_ROOM_PREFIX}-user-1"
+    assert server.get_room_name("user-1", "") == server.get_room_name("user-1")
+
+
+def test_users_never_share_a_session_room():
+    assert server.get_room_name("user-1", "abc") != server.get_room_name("user-2", "abc")
+    assert server.get_room_name("a-b", "c") != server.get_room_name("a", "b-c")
+
+
+@pytest.mark.parametrize("user_id, session_id", [
+    ("user 1", None),
+    ("user-1", "abc/def"),
+    ("user-1", "a.b"),
+    ("", None),
+    ("user-1", "x" * 65),
+])
+def test_ids_changed_by_sanitizing_are_rejected(user_id, session_id):
+    with pytest.raises(HTTPException) as excinfo:
+        server.get_room_name(user_id, session_id)
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,40 @@
+import tools
+
+
+def test_every_route_is_indexed_by_path():
+    for route_info in tools.ROUTES.values():
+        assert tools.get_route_by_path(route_info["path"]) is route_info
+
+
+def test_unknown_path():
+    assert tools.get_route_by_path("/does-not-exist") is None
+    assert tools.navigate_to_page("/does-not-exist")["success"] is False
+    assert tools.navigate_to_page("/dashboard")["route"] == "/dashboard"
+
+
+def test_summaries_list_every_route():
+    summary = tools.get_all_routes_summary()
+    pages = tools.get_available_pages_text()
+    for route_info in tools.ROUTES.values():
+        assert f"{route_info['name']} ({route_info['path']})" in summary
+        assert f"{route_info['name']} ({route_info['path']})" in pages
+        assert route_info["name"] in tools.get_routes_prompt()
+
+
+def test_refresh_routes_picks_up_changes():
+    tools.ROUTES["test_page"] = {
+        "path": "/test-page",
+        "name": "Test Page",
+        "description": "Only used by this test",
+        "category": "Testing",
+        "keywords": ["test page"],
+    }
+    try:
+        tools.refresh_routes()
+        assert tools.get_route_by_path("/test-page")["name"] == "Test Page"
+        assert "Test Page (/test-page)" in tools.get_all_routes_summary()
+    finally:
+        del tools.ROUTES["test_page"]
+        tools.refresh_routes()
+    assert tools.get_route_by_path("/test-page") is None
+    assert "Test Page" not in tools.get_all_routes_summary()
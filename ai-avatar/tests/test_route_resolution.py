@@ -0,0 +1,51 @@
+import pytest
+
+import tools
+
+# Page keywords and navigation requests -> expected route path
+KEYWORD_ROUTES = [
+    ("dashboard", "/dashboard"),
+    ("home", "/dashboard"),
+    ("lessons", "/lessons"),
+    ("lesson", "/lessons"),
+    ("voice tutor", "/voice-tutor"),
+    ("voice lesson", "/voice-tutor"),
+    ("past lessons", "/lernee-history"),
+    ("quiz", "/quiz"),
+    ("show my progress", "/progress"),
+    ("careers", "/career"),
+    ("job", "/jobs"),
+    ("sign language", "/bdsl-translator"),
+    ("login", "/"),
+    ("sign in", "/"),
+    ("new user", "/register"),
+    ("reset my password", "/forgot-password"),
+    ("activity log", "/activity"),
+    ("open settings", "/settings"),
+]
+
+# Words that look like page keywords but don't name a page
+UNMATCHED_KEYWORDS = ["logout", "log out", "sign out", "homework", "help", "new", "xyz"]
+
+
+@pytest.mark.parametrize("keyword, path", KEYWORD_ROUTES)
+def test_find_route_by_keyword(keyword, path):
+    route = tools.find_route_by_keyword(keyword)
+    assert route is not None
+    assert route["path"] == path
+
+
+@pytest.mark.parametrize("keyword", UNMATCHED_KEYWORDS)
+def test_find_route_by_keyword_rejects_weak_matches(keyword):
+    assert tools.find_route_by_keyword(keyword) is None
+
+
+def test_resolve_route_ranks_alternatives():
+    result = tools.resolve_route("past lessons", limit=2)
+    assert result["route"]["path"] == "/lernee-history"
+    assert [alternative["route"]["path"] for alternative in result["alternatives"]][0] == "/lessons"
+    assert result["confidence"] > result["alternatives"][0]["confidence"]
+
+
+def test_resolve_route_without_match():
+    assert tools.resolve_route("xyz") == {"route": None, "confidence": 0.0, "alternatives": []}
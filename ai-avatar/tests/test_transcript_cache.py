@@ -0,0 +1,44 @@
+import json
+import time
+
+import server
+from transcript_cache import TranscriptCache
+
+TRANSCRIPT = {
+    "video_id": "dQw4w9WgXcQ",
+    "language": "English",
+    "language_code": "en",
+    "segments": [("never gonna", 0.0, 1.5), ("give you up", 1.5, 2.0)],
+}
+
+
+def test_segments_load_from_disk_as_tuples(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    TranscriptCache(path=path).set_result("dQw4w9WgXcQ", "en", TRANSCRIPT)
+    entry = TranscriptCache(path=path).get("dQw4w9WgXcQ", "en")
+    assert entry["result"]["segments"] == TRANSCRIPT["segments"]
+
+
+def test_dict_segments_on_disk_are_compacted(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = TranscriptCache(path=path)
+    legacy = {**TRANSCRIPT, "segments": [
+        {"text": text, "start": start, "duration": duration}
+        for text, start, duration in TRANSCRIPT["segments"]
+    ]}
+    cache._db.execute(
+        "INSERT INTO transcripts VALUES (?, ?, ?, ?)",
+        ("dQw4w9WgXcQ", "en", json.dumps({"result": legacy, "expires_at": time.time() + 60}), time.time() + 60),
+    )
+    cache._db.commit()
+    entry = cache.get("dQw4w9WgXcQ", "en")
+    assert entry["result"]["segments"] == TRANSCRIPT["segments"]
+
+
+def test_responses_from_tuple_segments():
+    segments = server.window_segments(TRANSCRIPT["segments"], 1.6, None)
+    assert segments == [("give you up", 1.5, 2.0)]
+    response = server.build_transcript_response(TRANSCRIPT, TRANSCRIPT["segments"])
+    assert response["transcript"] == "never gonna give you up"
+    lines = list(server.iter_transcript_ndjson(TRANSCRIPT, segments))
+    assert json.loads(lines[1]) == {"text": "give you up", "start": 1.5, "duration": 2.0}
@@ -3,135 +3,20 @@ Navigation and utility tools for Sara AI Assistant
 Provides structured route information and navigation helpers
 """
 
-# SYNAPZ Platform Route Information
-ROUTES = {
-    "login": {
-        "path": "/",
-        "name": "Login",
-        "description": "Main login page for user authentication",
-        "category": "Authentication",
-        "keywords": ["login", "sign in", "home page", "start"]
-    },
-    "register": {
-        "path": "/register",
-        "name": "Register",
-        "description": "Create new learner or parent account",
-        "category": "Authentication",
-        "keywords": ["register", "sign up", "create account", "new user"]
-    },
-    "forgot-password": {
-        "path": "/forgot-password",
-        "name": "Forgot Password",
-        "description": "Reset forgotten password via email",
-        "category": "Authentication",
-        "keywords": ["forgot password", "reset password", "password help", "recover password"]
-    },
-    "dashboard": {
-        "path": "/dashboard",
-        "name": "Dashboard",
-        "description": "Main overview with learning progress, upcoming lessons, and quick access to features",
-        "category": "Learning",
-        "keywords": ["dashboard", "home", "main page", "overview", "main menu"]
-    },
-    "lessons": {
-        "path": "/lessons",
-        "name": "Lessons",
-        "description": "Browse and access all lessons across subjects (math, English, digital skills)",
-        "category": "Learning",
-        "keywords": ["lessons", "courses", "learning materials", "study", "learn"]
-    },
-    "quiz": {
-        "path": "/quiz",
-        "name": "Quiz",
-        "description": "Take quizzes and assessments to test your knowledge",
-        "category": "Learning",
-        "keywords": ["quiz", "test", "assessment", "practice questions", "exam"]
-    },
-    "adhd-learning": {
-        "path": "/adhd-learning",
-        "name": "ADHD Learning",
-        "description": "Specialized learning modules with ADHD-friendly content and reduced stimulation",
-        "category": "Learning",
-        "keywords": ["adhd", "focused learning", "special learning", "attention"]
-    },
-    "voice-tutor": {
-        "path": "/voice-tutor",
-        "name": "Voice Tutor",
-        "description": "Interactive voice-based lessons with Sara's guidance",
-        "category": "Learning",
-        "keywords": ["voice tutor", "voice lesson", "audio learning", "speak"]
-    },
-    "bdsl-translator": {
-        "path": "/bdsl-translator",
-        "name": "BdSL Translator",
-        "description": "Convert text/speech to Bangla Sign Language with 3D avatar demonstrations",
-        "category": "Learning",
-        "keywords": ["sign language", "bdsl", "translator", "sign translator", "deaf"]
-    },
-    "progress": {
-        "path": "/progress",
-        "name": "My Progress",
-        "description": "View detailed learning progress, completed lessons, and achievements",
-        "category": "Progress",
-        "keywords": ["progress", "achievements", "learning stats", "my progress", "results"]
-    },
-    "activity": {
-        "path": "/activity",
-        "name": "Activity",
-        "description": "View recent activities, learning history, and session logs",
-        "category": "Progress",
-        "keywords": ["activity", "recent activity", "history", "what did i do", "log"]
-    },
-    "lernee-history": {
-        "path": "/lernee-history",
-        "name": "Learning History",
-        "description": "Comprehensive learning history and past sessions",
-        "category": "Progress",
-        "keywords": ["learning history", "past lessons", "history log", "records"]
-    },
-    "schedule": {
-        "path": "/schedule",
-        "name": "Visual Schedule",
-        "description": "Daily/weekly visual schedule planner for neurodiverse learners",
-        "category": "Progress",
-        "keywords": ["schedule", "planner", "daily schedule", "calendar", "plan"]
-    },
-    "skills": {
-        "path": "/skills",
-        "name": "Skills Assessment",
-        "description": "Evaluate current skills and identify strengths and areas for improvement",
-        "category": "Career",
-        "keywords": ["skills", "assessment", "skill test", "evaluate skills", "abilities"]
-    },
-    "jobs": {
-        "path": "/jobs",
-        "name": "Job Matching",
-        "description": "Browse job opportunities matched to your skills and interests",
-        "category": "Career",
-        "keywords": ["jobs", "find jobs", "job search", "employment", "work"]
-    },
-    "career": {
-        "path": "/career",
-        "name": "Career Path",
-        "description": "Explore career options and create career development plans",
-        "category": "Career",
-        "keywords": ["career", "career path", "career planning", "future jobs"]
-    },
-    "settings": {
-        "path": "/settings",
-        "name": "Settings",
-        "description": "User preferences, accessibility settings, and profile management",
-        "category": "Configuration",
-        "keywords": ["settings", "preferences", "options", "configure", "profile"]
-    },
-    "parent": {
-        "path": "/parent",
-        "name": "Parent Dashboard",
-        "description": "Parent/guardian view of child's progress and supervision management",
-        "category": "Parent",
-        "keywords": ["parent", "parent dashboard", "parent view", "guardian page"]
-    }
-}
+from bisect import bisect_left
+import json
+import os
+import re
+
+# SYNAPZ Platform Route Information, loaded from the route catalog file
+# (routes.json) by load_route_catalog() at import
+ROUTE_CATALOG_PATH = os.environ.get(
+    "ROUTE_CATALOG_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "routes.json"),
+)
+ROUTES = {}
+# Route keys offered as examples when a page can't be found
+SUGGESTED_ROUTES = []
 
 def get_route_by_name(route_name: str) -> dict:
     """
@@ -145,27 +30,329 @@ def get_route_by_name(route_name: str) -> dict:
     """
     return ROUTES.get(route_name.lower())
 
-def find_route_by_keyword(keyword: str) -> dict:
+# Route search index, built once from ROUTES at import
+
+# Filler words in navigation requests that say nothing about the target page
+_STOPWORDS = {
+    "a", "an", "the", "to", "me", "i", "my", "want", "go", "goto", "take", "open",
+    "show", "please", "page", "can", "you", "would", "like", "navigate", "lets",
+    "let", "us", "on", "of", "for", "and", "now", "get", "see", "view", "where",
+    "is", "are", "screen", "section",
+    # Bangla
+    "যাও", "যান", "চলো", "চল", "দেখাও", "দেখান", "খোলো", "খুলুন", "আমার", "আমাকে",
+    "নিয়ে", "পেজ", "পেজে", "পাতায়", "তে", "একটু", "প্লিজ",
+}
+# Word characters plus the Bengali block, whose vowel signs are not matched by \w
+_TOKEN_PATTERN = re.compile(r"[\w\u0980-\u09FF]+")
+
+# Score weights per match type
+_PHRASE_WEIGHT = 3.0
+_EXACT_BONUS = 5.0
+_FIELD_WEIGHTS = {"keyword": 1.0, "name": 1.2, "key": 1.0, "description": 0.3}
+_PARTIAL_FACTOR = 0.5
+_MIN_PARTIAL_LENGTH = 4
+_MIN_STEM_LENGTH = 3
+# Longest suffix a stem match may drop (e.g. 'লেসনে' -> 'লেসন', but not 'logout' -> 'log')
+_MAX_STEM_SUFFIX = 2
+# Tokens that only qualify a single multi-word phrase of a route ('help' in
+# 'password help', 'new' in 'new user') are weak evidence for it on their own
+_WEAK_FACTOR = 0.5
+# Fuzzy (misspelled / transliterated) matches by edit distance
+_FUZZY_FACTORS = {1: 0.6, 2: 0.4}
+_MIN_FUZZY_LENGTH = 4
+
+def _normalize(token: str) -> str:
+    """Drop a plural 's' so 'lesson' and 'lessons' index the same way"""
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+def _tokenize(text: str) -> list:
+    return [_normalize(token) for token in _TOKEN_PATTERN.findall(text.lower().replace("'", ""))]
+
+def _build_route_index() -> tuple:
+    """
+    Build the lookup structures used by resolve_route:
+    - phrases: first token -> list of (phrase tokens, route key) for keyword/name phrases
+    - tokens: token -> {route key: weight} inverted index over all route fields
+    - sorted token list for prefix (partial) matches
+    - trigram -> tokens index of keyword/name tokens for fuzzy matches
+    - strong (token, route key) pairs: the token is a whole keyword/name of the
+      route or appears in several of its phrases
+    """
+    phrases = {}
+    tokens = {}
+    trigrams = {}
+    strong = set()
+    for route_key, route_info in ROUTES.items():
+        fields = [("key", route_key.replace("-", " ")), ("name", route_info["name"])]
+        fields += [("keyword", keyword) for keyword in route_info["keywords"]]
+        fields += [("keyword", keyword) for keyword in route_info.get("keywords_bn", [])]
+        fields.append(("description", route_info["description"]))
+
+        phrase_counts = {}
+        seen_phrases = set()
+        for field, text in fields:
+            field_tokens = _tokenize(text)
+            if not field_tokens:
+                continue
+            if field != "description":
+                phrases.setdefault(field_tokens[0], []).append((tuple(field_tokens), route_key))
+                content_tokens = tuple(token for token in field_tokens if token not in _STOPWORDS)
+                if len(content_tokens) == 1:
+                    strong.add((content_tokens[0], route_key))
+                elif content_tokens not in seen_phrases:
+                    seen_phrases.add(content_tokens)
+                    for token in set(content_tokens):
+                        phrase_counts[token] = phrase_counts.get(token, 0) + 1
+            weight = _FIELD_WEIGHTS[field]
+            for token in field_tokens:
+                if token in _STOPWORDS:
+                    continue
+                route_weights = tokens.setdefault(token, {})
+                route_weights[route_key] = max(route_weights.get(route_key, 0.0), weight)
+                # Descriptions are too noisy to fuzzy-match against
+                if field != "description" and len(token) >= _MIN_FUZZY_LENGTH - 1:
+                    for trigram in _trigrams(token):
+                        trigrams.setdefault(trigram, set()).add(token)
+        strong.update((token, route_key) for token, count in phrase_counts.items() if count > 1)
+
+    # Longest phrases first so the most specific phrase is tried first
+    for candidates in phrases.values():
+        candidates.sort(key=lambda candidate: -len(candidate[0]))
+    return phrases, tokens, sorted(tokens), trigrams, strong
+
+def _trigrams(token: str) -> set:
+    padded = f"#{token}#"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance between a and b, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+def _fuzzy_matches(token: str) -> list:
+    """
+    Closest keyword/name tokens within a small edit distance
+    (e.g. 'dashbord' -> 'dashboard', 'kuiz' -> 'quiz')
+
+    Returns:
+        List of (index token, score factor) tuples
+    """
+    if len(token) < _MIN_FUZZY_LENGTH:
+        return []
+    limit = 1 if len(token) <= 5 else 2
+    candidates = set()
+    for trigram in _trigrams(token):
+        candidates.update(_TRIGRAM_INDEX.get(trigram, ()))
+
+    matches = []
+    best = limit + 1
+    for candidate in candidates:
+        distance = _edit_distance(token, candidate, limit)
+        if distance < best:
+            best, matches = distance, [candidate]
+        elif distance == best:
+            matches.append(candidate)
+    if best > limit:
+        return []
+    return [(match, _FUZZY_FACTORS[best]) for match in matches]
+
+def _partial_matches(token: str) -> list:
+    """
+    Index tokens that start with the given token (e.g. 'assess' -> 'assessment')
+    or that the token starts with, less a short suffix (e.g. 'লেসনে' -> 'লেসন')
+    """
+    matches = [
+        token[:length]
+        for length in range(max(_MIN_STEM_LENGTH, len(token) - _MAX_STEM_SUFFIX), len(token))
+        if token[:length] in _TOKEN_INDEX
+    ]
+    if len(token) < _MIN_PARTIAL_LENGTH:
+        return matches
+    position = bisect_left(_SORTED_TOKENS, token)
+    while position < len(_SORTED_TOKENS) and _SORTED_TOKENS[position].startswith(token):
+        if _SORTED_TOKENS[position] != token:
+            matches.append(_SORTED_TOKENS[position])
+        position += 1
+    return matches
+
+def _phrase_matches(query_tokens: list) -> list:
+    """
+    Whole keyword/name phrases found in the query, skipping phrases inside a
+    longer match ('lesson' within 'voice lesson')
+
+    Returns:
+        List of (start position, end position, route key) tuples
     """
-    Find a route by searching keywords
+    matches = []
+    for position, token in enumerate(query_tokens):
+        for phrase, route_key in _PHRASE_INDEX.get(token, ()):
+            end = position + len(phrase)
+            if tuple(query_tokens[position:end]) != phrase:
+                continue
+            if any(start <= position and end <= stop and stop - start > len(phrase)
+                   for start, stop, _ in matches):
+                continue
+            matches.append((position, end, route_key))
+    return matches
+
+def resolve_route(query: str, limit: int = 3) -> dict:
+    """
+    Rank routes against a free-form navigation request
+
+    Args:
+        query: User's navigation request or page keyword in English or Bangla
+            (e.g., 'show my progress', 'কুইজ'); misspellings are matched fuzzily
+        limit: Number of alternatives to return besides the best route
+
+    Returns:
+        Dictionary with the best 'route' (or None), its 'confidence' (0-1) and
+        'alternatives' as a list of {'route', 'confidence'} dictionaries
+    """
+    query_tokens = _tokenize(query)
+    scores = {}
+    matched_tokens = {}
+    weak_tokens = {}
+
+    for start, end, route_key in _phrase_matches(query_tokens):
+        score = _PHRASE_WEIGHT * (end - start)
+        if end - start == len(query_tokens):
+            score += _EXACT_BONUS
+        scores[route_key] = scores.get(route_key, 0.0) + score
+        matched_tokens.setdefault(route_key, set()).update(range(start, end))
+
+    # Token matches plus partial (prefix/stem) matches, falling back to fuzzy matches
+    content_positions = [
+        position for position, token in enumerate(query_tokens)
+        if token not in _STOPWORDS
+    ]
+    for position in content_positions:
+        token = query_tokens[position]
+        candidates = [(token, 1.0)] if token in _TOKEN_INDEX else []
+        candidates += [(match, _PARTIAL_FACTOR) for match in _partial_matches(token)]
+        if not candidates:
+            candidates = _fuzzy_matches(token)
+        for index_token, factor in candidates:
+            for route_key, weight in _TOKEN_INDEX[index_token].items():
+                if (index_token, route_key) in _STRONG_TOKENS:
+                    scores[route_key] = scores.get(route_key, 0.0) + weight * factor
+                    matched_tokens.setdefault(route_key, set()).add(position)
+                else:
+                    scores[route_key] = scores.get(route_key, 0.0) + weight * factor * _WEAK_FACTOR
+                    weak_tokens.setdefault(route_key, set()).add(position)
+
+    if not scores:
+        return {"route": None, "confidence": 0.0, "alternatives": []}
+
+    total = sum(scores.values())
+    content_count = max(len(content_positions), 1)
+
+    def confidence(route_key: str) -> float:
+        share = scores[route_key] / total
+        matched = matched_tokens.get(route_key, set()).intersection(content_positions)
+        weak = weak_tokens.get(route_key, set()).intersection(content_positions)
+        # A weak token counts only alongside another matched token ('reset my password')
+        if len(matched | weak) > 1:
+            matched |= weak
+        coverage = min(len(matched) / content_count, 1.0) if content_positions else 1.0
+        return round(0.5 * share + 0.5 * coverage, 3)
+
+    ranked = sorted(scores, key=lambda route_key: -scores[route_key])
+    return {
+        "route": ROUTES[ranked[0]],
+        "confidence": confidence(ranked[0]),
+        "alternatives": [
+            {"route": ROUTES[route_key], "confidence": confidence(route_key)}
+            for route_key in ranked[1:limit + 1]
+        ],
+    }
+
+# Words that mark an utterance as a navigation command (English and Bangla).
+# "show" is left out on purpose: "show me a quiz question" is not navigation.
+_NAVIGATION_CUES = {
+    "go", "goto", "open", "navigate", "visit", "bring",
+    "যাও", "যান", "চলো", "চল", "খোলো", "খুলুন", "নিয়ে",
+}
+# "take" is only a cue when followed by "to" or "page": "take me to the quiz",
+# but not "take a quiz"
+_TAKE_CUE_FOLLOWERS = {"to", "page"}
+# Minimum confidence for find_route_by_keyword to return a route
+ROUTE_MATCH_MIN_CONFIDENCE = 0.8
+NAVIGATION_INTENT_MIN_CONFIDENCE = 0.8
+NAVIGATION_INTENT_MIN_MARGIN = 0.2
+NAVIGATION_INTENT_MAX_TOKENS = 10
+
+def _has_take_cue(tokens: list) -> bool:
+    if "take" not in tokens:
+        return False
+    return not _TAKE_CUE_FOLLOWERS.isdisjoint(tokens[tokens.index("take") + 1:])
+
+def detect_navigation_intent(utterance: str) -> dict:
+    """
+    Recognize short, unambiguous navigation commands (e.g. 'go to lessons')
+    so they can be handled without an LLM round-trip. Besides the navigation
+    cue and filler words, the utterance may only contain a name or keyword
+    phrase of the route: 'go to the last quiz question' is left to the LLM.
     
     Args:
-        keyword: Search term to find matching route
+        utterance: Final user transcript
     
     Returns:
-        Dictionary with route information or None if not found
+        Dictionary with route information, or None if the utterance is not a
+        high-confidence navigation command
     """
-    keyword_lower = keyword.lower()
+    tokens = _tokenize(utterance)
+    if not tokens or len(tokens) > NAVIGATION_INTENT_MAX_TOKENS:
+        return None
+    if _NAVIGATION_CUES.isdisjoint(tokens) and not _has_take_cue(tokens):
+        return None
     
-    for route_key, route_info in ROUTES.items():
-        if keyword_lower in route_info["keywords"]:
-            return route_info
-        if keyword_lower in route_info["name"].lower():
-            return route_info
-        if keyword_lower in route_info["description"].lower():
-            return route_info
+    result = resolve_route(utterance, limit=1)
+    if not result["route"] or result["confidence"] < NAVIGATION_INTENT_MIN_CONFIDENCE:
+        return None
+    alternatives = result["alternatives"]
+    if alternatives and result["confidence"] - alternatives[0]["confidence"] < NAVIGATION_INTENT_MIN_MARGIN:
+        return None
+    
+    # Description, partial and fuzzy token matches are not enough here
+    covered = set()
+    for start, end, route_key in _phrase_matches(tokens):
+        if ROUTES[route_key] is result["route"]:
+            covered.update(range(start, end))
+    for position, token in enumerate(tokens):
+        if position not in covered and token not in _STOPWORDS and token not in _NAVIGATION_CUES:
+            return None
+    return result["route"]
+
+def find_route_by_keyword(keyword: str) -> dict:
+    """
+    Find the best matching route for a keyword or navigation request
+    
+    Args:
+        keyword: Search term to find matching route
     
-    return None
+    Returns:
+        Dictionary with route information, or None if no route matches with
+        at least ROUTE_MATCH_MIN_CONFIDENCE
+    """
+    result = resolve_route(keyword, limit=0)
+    if result["confidence"] < ROUTE_MATCH_MIN_CONFIDENCE:
+        return None
+    return result["route"]
 
 def get_routes_by_category(category: str) -> list:
     """
@@ -206,17 +393,10 @@ def get_navigation_response(user_query: str, base_url: str = "http://localhost:3
     else:
         return (
             "I'm not sure which page you're looking for. "
-            "Could you try saying one of these: dashboard, lessons, quiz, progress, "
-            "jobs, career, settings, or schedule?"
+            f"Could you try saying one of these: {get_suggested_pages_text()}?"
         )
 
-def get_all_routes_summary() -> str:
-    """
-    Get a summary of all available routes
-    
-    Returns:
-        String with formatted list of all routes
-    """
+def _render_routes_summary() -> str:
     summary = "Here are all the pages you can visit on SYNAPZ:\n\n"
     
     categories = {}
@@ -226,13 +406,82 @@ def get_all_routes_summary() -> str:
             categories[category] = []
         categories[category].append(route_info)
     
+    parts = [summary]
     for category, routes in categories.items():
-        summary += f"{category}:\n"
+        parts.append(f"{category}:\n")
         for route in routes:
-            summary += f"  - {route['name']} ({route['path']}): {route['description']}\n"
-        summary += "\n"
+            parts.append(f"  - {route['name']} ({route['path']}): {route['description']}\n")
+        parts.append("\n")
+    
+    return "".join(parts)
+
+def _render_available_pages() -> str:
+    return "Available pages:\n" + "\n".join(
+        f"- {route_info['name']} ({route_info['path']}): {route_info['description']}"
+        for route_info in ROUTES.values()
+    )
+
+def _render_routes_prompt() -> str:
+    categories = {}
+    for route_info in ROUTES.values():
+        categories.setdefault(route_info["category"], []).append(route_info["name"])
+    return "\n".join(
+        f"- {category}: {', '.join(names)}" for category, names in categories.items()
+    )
+
+def _render_suggested_pages() -> str:
+    if len(SUGGESTED_ROUTES) < 2:
+        return "".join(SUGGESTED_ROUTES)
+    return f"{', '.join(SUGGESTED_ROUTES[:-1])}, or {SUGGESTED_ROUTES[-1]}"
+
+def get_all_routes_summary() -> str:
+    """
+    Get a summary of all available routes, grouped by category
+    
+    Returns:
+        String with formatted list of all routes
+    """
+    return _ROUTE_TEXT["summary"]
+
+def get_available_pages_text() -> str:
+    """
+    Get a flat list of all available pages with their paths and descriptions
+    
+    Returns:
+        String with one line per page
+    """
+    return _ROUTE_TEXT["pages"]
+
+def get_routes_prompt() -> str:
+    """
+    Get the compact route list for the system prompt: page names grouped by
+    category. Paths and descriptions come from get_available_pages on demand.
     
-    return summary
+    Returns:
+        String with one line per category
+    """
+    return _ROUTE_TEXT["prompt"]
+
+def get_suggested_pages_text() -> str:
+    """
+    Get the example page keywords offered when a page can't be found
+    
+    Returns:
+        String such as 'dashboard, lessons, or quiz'
+    """
+    return _ROUTE_TEXT["suggested"]
+
+def get_route_by_path(route_path: str) -> dict:
+    """
+    Get route information by its path
+    
+    Args:
+        route_path: Route path (e.g., '/dashboard')
+    
+    Returns:
+        Dictionary with route information or None if not found
+    """
+    return ROUTES_BY_PATH.get(route_path)
 
 def suggest_next_page(current_page: str, user_goal: str = None) -> dict:
     """
@@ -288,12 +537,7 @@ def navigate_to_page(route_path: str) -> dict:
         Dictionary with navigation command and status
     """
     # Validate that the route exists
-    route_exists = any(
-        route_info['path'] == route_path 
-        for route_info in ROUTES.values()
-    )
-    
-    if not route_exists and route_path != '/':
+    if route_path not in ROUTES_BY_PATH and route_path != '/':
         return {
             "success": False,
             "error": f"Invalid route: {route_path}",
@@ -307,14 +551,64 @@ def navigate_to_page(route_path: str) -> dict:
         "message": f"Navigating to {route_path}"
     }
 
+# Lookup tables and pre-rendered text derived from ROUTES
+ROUTES_BY_PATH = {}
+_ROUTE_TEXT = {}
+
+def refresh_routes():
+    """
+    Rebuild every lookup index and pre-rendered text derived from ROUTES.
+    Runs from load_route_catalog(); call it again after changing ROUTES directly.
+    """
+    global _PHRASE_INDEX, _TOKEN_INDEX, _SORTED_TOKENS, _TRIGRAM_INDEX, _STRONG_TOKENS
+    _PHRASE_INDEX, _TOKEN_INDEX, _SORTED_TOKENS, _TRIGRAM_INDEX, _STRONG_TOKENS = _build_route_index()
+    
+    # Updated in place so modules that imported ROUTES_BY_PATH see the change
+    ROUTES_BY_PATH.clear()
+    ROUTES_BY_PATH.update({route_info["path"]: route_info for route_info in ROUTES.values()})
+    
+    _ROUTE_TEXT["summary"] = _render_routes_summary()
+    _ROUTE_TEXT["pages"] = _render_available_pages()
+    _ROUTE_TEXT["prompt"] = _render_routes_prompt()
+    _ROUTE_TEXT["suggested"] = _render_suggested_pages()
+
+def load_route_catalog(path: str = ROUTE_CATALOG_PATH):
+    """
+    Load ROUTES from a route catalog file and rebuild everything derived from it
+    
+    Args:
+        path: JSON file with 'routes' (route key -> route information) and
+            'suggested' (route keys offered as examples)
+    """
+    with open(path, encoding="utf-8") as catalog_file:
+        catalog = json.load(catalog_file)
+    
+    # Updated in place so modules that imported ROUTES see the new catalog
+    ROUTES.clear()
+    ROUTES.update(catalog["routes"])
+    SUGGESTED_ROUTES[:] = [key for key in catalog.get("suggested", []) if key in ROUTES]
+    refresh_routes()
+
+load_route_catalog()
+
 # Export functions for use in agent
 __all__ = [
     'ROUTES',
     'get_route_by_name',
     'find_route_by_keyword',
+    'resolve_route',
+    'detect_navigation_intent',
     'get_routes_by_category',
     'get_navigation_response',
     'get_all_routes_summary',
+    'get_available_pages_text',
+    'get_route_by_path',
+    'refresh_routes',
+    'load_route_catalog',
+    'get_routes_prompt',
+    'get_suggested_pages_text',
+    'SUGGESTED_ROUTES',
+    'ROUTES_BY_PATH',
     'suggest_next_page',
     'navigate_to_page'
 ]
@@ -0,0 +1,215 @@
+"""
+YouTube Transcript Cache for SYNAPZ AI
+Two-tier (in-process LRU + on-disk SQLite) cache for transcript lookups
+"""
+
+from collections import OrderedDict
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+TRANSCRIPT_CACHE_SIZE = int(os.environ.get("TRANSCRIPT_CACHE_SIZE", "256"))
+TRANSCRIPT_CACHE_TTL = int(os.environ.get("TRANSCRIPT_CACHE_TTL", str(7 * 24 * 60 * 60)))
+TRANSCRIPT_CACHE_NEGATIVE_TTL = int(os.environ.get("TRANSCRIPT_CACHE_NEGATIVE_TTL", str(60 * 60)))
+TRANSCRIPT_CACHE_PATH = os.environ.get("TRANSCRIPT_CACHE_PATH", "transcript_cache.sqlite3")
+
+
+def _compact_segments(segments: list) -> list:
+    """
+    Turn JSON-decoded segments back into (text, start, duration) tuples,
+    including rows written when segments were stored as dicts
+    """
+    return [
+        (segment["text"], segment["start"], segment["duration"])
+        if isinstance(segment, dict) else tuple(segment)
+        for segment in segments
+    ]
+
+
+class TranscriptCache:
+    """
+    Cache of transcript lookups keyed by (video_id, language_code).
+
+    Successful lookups are stored as the response payload, with segments as
+    (text, start, duration) tuples rather than per-segment dicts. Failed lookups
+    (transcripts disabled / not found) are stored as negative entries with
+    their HTTP status and detail so repeat requests fail fast without
+    calling YouTube again.
+
+    Only the in-memory tier is touched under the cache lock. SQLite reads and
+    writes take a separate connection lock, so get() and the setters do blocking
+    disk work and belong on a worker thread; get_from_memory() is safe to call
+    on the event loop.
+    """
+
+    def __init__(
+        self,
+        max_size: int = TRANSCRIPT_CACHE_SIZE,
+        ttl: int = TRANSCRIPT_CACHE_TTL,
+        negative_ttl: int = TRANSCRIPT_CACHE_NEGATIVE_TTL,
+        path: str | None = TRANSCRIPT_CACHE_PATH,
+    ):
+        """
+        Args:
+            max_size: Maximum number of entries kept in memory
+            ttl: Seconds a successful transcript stays valid
+            negative_ttl: Seconds a failed lookup stays valid
+            path: SQLite file for the disk tier, or None to disable it
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._memory: OrderedDict[tuple[str, str], dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db = None
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+        }
+
+        if path:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS transcripts ("
+                    "video_id TEXT NOT NULL, "
+                    "language_code TEXT NOT NULL, "
+                    "entry TEXT NOT NULL, "
+                    "expires_at REAL NOT NULL, "
+                    "PRIMARY KEY (video_id, language_code))"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Transcript disk cache disabled: {e}")
+                self._db = None
+
+    def get_from_memory(self, video_id: str, language_code: str) -> dict | None:
+        """
+        Look up an entry in the in-memory tier only, without blocking on disk.
+        A None result is not counted as a miss; follow it with get().
+
+        Returns:
+            Entry dictionary with either a 'result' or an 'error' key, or None
+        """
+        key = (video_id, language_code)
+        with self._lock:
+            entry = self._memory.get(key)
+            if not entry:
+                return None
+            if entry["expires_at"] <= time.time():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self._record_hit(entry, "memory_hits")
+            return entry
+
+    def get(self, video_id: str, language_code: str) -> dict | None:
+        """
+        Look up a cached entry in memory, then on disk. Blocks on SQLite.
+
+        Returns:
+            Entry dictionary with either a 'result' or an 'error' key, or None on a miss
+        """
+        entry = self.get_from_memory(video_id, language_code)
+        if entry:
+            return entry
+
+        key = (video_id, language_code)
+        entry = self._load(key, time.time())
+        with self._lock:
+            if entry:
+                self._remember(key, entry)
+                self._record_hit(entry, "disk_hits")
+            else:
+                self.stats["misses"] += 1
+        return entry
+
+    def set_result(self, video_id: str, language_code: str, result: dict):
+        """Store a successful transcript response"""
+        self._store((video_id, language_code), {
+            "result": result,
+            "expires_at": time.time() + self.ttl,
+        })
+
+    def set_error(self, video_id: str, language_code: str, status_code: int, detail: str):
+        """Store a failed lookup so it is not retried until the negative TTL expires"""
+        self._store((video_id, language_code), {
+            "error": {"status_code": status_code, "detail": detail},
+            "expires_at": time.time() + self.negative_ttl,
+        })
+
+    def get_stats(self) -> dict:
+        """Return hit/miss counters and current cache size"""
+        with self._lock:
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            lookups = hits + self.stats["misses"]
+            return {
+                **self.stats,
+                "hits": hits,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_enabled": self._db is not None,
+            }
+
+    def _record_hit(self, entry: dict, tier: str):
+        self.stats[tier] += 1
+        if "error" in entry:
+            self.stats["negative_hits"] += 1
+
+    def _remember(self, key: tuple[str, str], entry: dict):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def _store(self, key: tuple[str, str], entry: dict):
+        with self._lock:
+            self._remember(key, entry)
+        if not self._db:
+            return
+        payload = json.dumps(entry)
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?)",
+                    (key[0], key[1], payload, entry["expires_at"]),
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error writing transcript cache entry: {e}")
+
+    def _load(self, key: tuple[str, str], now: float) -> dict | None:
+        if not self._db:
+            return None
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT entry, expires_at FROM transcripts "
+                    "WHERE video_id = ? AND language_code = ?",
+                    key,
+                ).fetchone()
+                if row and row[1] <= now:
+                    self._db.execute(
+                        "DELETE FROM transcripts WHERE video_id = ? AND language_code = ?",
+                        key,
+                    )
+                    self._db.commit()
+                    return None
+            if not row:
+                return None
+            entry = json.loads(row[0])
+            if "result" in entry:
+                entry["result"]["segments"] = _compact_segments(entry["result"]["segments"])
+            return entry
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Error reading transcript cache entry: {e}")
+            return None